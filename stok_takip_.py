@@ -3,8 +3,29 @@ from tkinter import ttk, messagebox, simpledialog, filedialog
 import sqlite3
 import csv
 import os
+import gzip
+import shutil
+import threading
+import time
+import sys
+import json
+import hashlib
+import logging
+import mmap
+import operator
+import ctypes
+from array import array
+from itertools import compress, repeat
+from datetime import datetime
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 
+try:
+    import numpy as np      # İsteğe bağlı: kolonsal analizleri hızlandırır
+except ImportError:
+    np = None
+
 # ==========================================
 # AYARLAR VE VERİTABANI BAĞLANTISI
 # ==========================================
@@ -13,27 +34,110 @@ from contextlib import contextmanager
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_NAME = os.path.join(BASE_DIR, "malzeme_takip_v2.db")
 
+# Yedekler veritabanının yanındaki 'yedekler' klasöründe sıkıştırılmış olarak tutulur.
+YEDEK_DIR = os.path.join(BASE_DIR, "yedekler")
+YEDEK_ARALIGI_SN = 60 * 60      # Otomatik yedekleme aralığı (1 saat)
+YEDEK_SAKLAMA_SAYISI = 10       # Saklanacak en yeni yedek sayısı
+YEDEK_ADIM_SAYFA = 64           # Her adımda kopyalanan sayfa sayısı
+YEDEK_ADIM_BEKLEME = 0.005      # Adımlar arası bekleme (saniye)
+YEDEK_YENIDEN_BASLAMA_SINIRI = 20   # WAL kapalıyken araya giren yazmalar nedeniyle izin verilen yeniden başlama
+
+# WAL günlüğü: None -> yerel diskte açık, ağ paylaşımında kapalı; True/False ile zorlanır.
+# WAL paylaşımlı bellek kullandığından ağ dosya sistemleri (NFS, SMB) üzerinde güvenli değildir.
+WAL_MODU = None
+AG_DOSYA_SISTEMLERI = {"nfs", "nfs4", "cifs", "smb", "smb2", "smbfs", "afs", "9p", "fuse.sshfs", "davfs", "ncpfs"}
+
+# Bu dosya varsa uygulama çoklu atölye (federasyon) modunda açılır. Satır biçimi: atölye;veritabanı_yolu
+SITELER_DOSYASI = os.path.join(BASE_DIR, "siteler.csv")
+FEDERE_ISCI_SAYISI = 16             # Paralel atölye sorgusu için en fazla thread
+FEDERE_ID_CARPANI = 1_000_000_000   # Global malzeme ID = atölye sırası * çarpan + yerel ID
+FEDERE_ATTACH_SINIRI = 10           # SQLite'ın bir bağlantıya ATTACH edebildiği varsayılan veritabanı sayısı
+
+KUYRUK_GRUP_BOYUTU = 500        # Tek commit ile işlenen en fazla sipariş
+KUYRUK_BEKLEME_SN = 0.05        # Kuyruk boşken yeni sipariş için ilk bekleme süresi
+KUYRUK_EN_UZUN_BEKLEME_SN = 2.0 # Boşta bekleme her turda ikiye katlanır, en fazla bu kadar
+KUYRUK_IZLEME_MS = 500          # Arayüzün kuyruk sonuçlarını kontrol etme aralığı
+
+# Açık olduğunda pencere hemen gösterilir, sekmeler ilk seçildiklerinde kurulur.
+HIZLI_ACILIS = True
+
+GECMIS_ARAMA_GECIKMESI_MS = 250    # Geçmiş aramasında son tuştan sonra bekleme
+ARAMA_SIRALAMA_SINIRI = 5000        # Bu sayıya kadar eşleşme bm25 ile sıralanır, fazlasında en yeniler döner
+SENKRON_ARALIGI_MS = 1000           # Diğer istemcilerin değişikliklerini kontrol etme aralığı
+DEGISIKLIK_LIMITI = 500             # Bundan fazla değişiklik birikmişse tam yenileme yapılır
+DEGISIKLIK_SAKLAMA_SAYISI = 100000  # Değişiklik günlüğünde tutulan en yeni kayıt sayısı
+DEGISIKLIK_BUDAMA_ARALIGI_SN = 60   # Uygulama açıkken günlüğün budanma aralığı
+
+log = logging.getLogger(__name__)
+
+# Kolonsal anlık görüntü önbelleği (bkz. EnvanterGoruntusu)
+ONBELLEK_DIR = os.path.join(BASE_DIR, "onbellek")
+
 @contextmanager
-def veritabani_baglantisi():
-    """SQLite bağlantısını yöneten güvenli yapı."""
+def veritabani_baglantisi(db_yolu=None, sessiz=False):
+    """SQLite bağlantısını yöneten güvenli yapı. sessiz=True ise hata kutusu gösterilmez (periyodik işler için)."""
     conn = None
     try:
-        conn = sqlite3.connect(DB_NAME)
+        conn = sqlite3.connect(db_yolu or DB_NAME)
         conn.execute("PRAGMA foreign_keys = ON")
         yield conn
     except sqlite3.Error as e:
-        messagebox.showerror("Veritabanı Hatası", f"Bağlantı hatası: {e}")
+        if not sessiz:
+            messagebox.showerror("Veritabanı Hatası", f"Bağlantı hatası: {e}")
         if conn: conn.rollback()
         raise
     finally:
         if conn: conn.close()
 
+def _ag_surucusu_mu(yol):
+    """Dosya bir ağ paylaşımında mı? Belirlenemezse yerel kabul edilir."""
+    if sys.platform == "win32":
+        surucu = os.path.splitdrive(os.path.abspath(yol))[0]
+        if surucu.startswith("\\\\"):
+            return True     # UNC yolu (\\sunucu\paylasim)
+        DRIVE_REMOTE = 4
+        return ctypes.windll.kernel32.GetDriveTypeW(surucu + "\\") == DRIVE_REMOTE
+    yol = os.path.realpath(yol)
+    try:
+        with open("/proc/mounts", encoding="utf-8", errors="replace") as f:
+            baglamalar = [satir.split() for satir in f]
+    except OSError:
+        return False
+    en_yakin, tur = "", ""
+    for parca in baglamalar:
+        if len(parca) < 3:
+            continue
+        nokta = parca[1].replace("\\040", " ")
+        if (yol == nokta or yol.startswith(nokta.rstrip("/") + "/")) and len(nokta) > len(en_yakin):
+            en_yakin, tur = nokta, parca[2]
+    return tur in AG_DOSYA_SISTEMLERI
+
+def _vurguyu_aktar(vurgulu, orijinal, ac="«", kapa="»", genislik=120):
+    """FTS5 highlight() çıktısındaki işaretleri (char 2/3) orijinal metne aktarır ve uzun metni kısaltır."""
+    if orijinal is None:
+        return ""
+    parcalar, i = [], 0
+    for ch in vurgulu or "":
+        if ch == "\x02":
+            parcalar.append(ac)
+        elif ch == "\x03":
+            parcalar.append(kapa)
+        else:
+            parcalar.append(orijinal[i] if i < len(orijinal) else ch)
+            i += 1
+    metin = "".join(parcalar)
+    if len(metin) > genislik:
+        bas = max(0, metin.find(ac) - genislik // 3)
+        metin = ("…" if bas else "") + metin[bas:bas + genislik] + "…"
+    return metin
+
 # ==========================================
 # 1. VERİTABANI KATMANI (Backend)
 # ==========================================
 
 class Veritabani:
-    def __init__(self):
+    def __init__(self, db_yolu=None):
+        self.db_yolu = db_yolu or DB_NAME
         # Eğer dosya yoksa tabloları oluşturur, varsa mevcut olana dokunmaz.
         self._tablo_olustur()
         
@@ -41,8 +145,16 @@ class Veritabani:
         self._baslangic_kontrol()
 
     def _tablo_olustur(self):
-        with veritabani_baglantisi() as conn:
+        with veritabani_baglantisi(self.db_yolu) as conn:
             cursor = conn.cursor()
+            # WAL modunda okuyucular (ör. yedekleme) yazıcıları bloklamaz. Ayar dosyada kalıcıdır,
+            # bu yüzden kapalıyken (ör. ağ paylaşımı) eski moda geri dönülür.
+            wal = WAL_MODU if WAL_MODU is not None else not _ag_surucusu_mu(self.db_yolu)
+            try:
+                cursor.execute(f"PRAGMA journal_mode = {'WAL' if wal else 'DELETE'}")
+            except sqlite3.OperationalError:
+                pass    # Başka bir istemci bağlıyken mod değiştirilemez; mevcut mod korunur
+            self.wal_modu = cursor.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
             # Yüklediğiniz dosyadaki şema ile birebir aynı yapı
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS malzemeler (
@@ -52,6 +164,10 @@ class Veritabani:
                     kritik_esik INTEGER NOT NULL
                 )
             """)
+            # Eski veritabanlarında birim maliyet sütunu yoksa eklenir.
+            cursor.execute("PRAGMA table_info(malzemeler)")
+            if 'birim_maliyet' not in [r[1] for r in cursor.fetchall()]:
+                cursor.execute("ALTER TABLE malzemeler ADD COLUMN birim_maliyet REAL NOT NULL DEFAULT 0")
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS tarifler (
                     urun_ad TEXT NOT NULL,
@@ -70,11 +186,107 @@ class Veritabani:
                     miktar_degisim REAL
                 )
             """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS siparis_kuyrugu (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    urun_ad TEXT NOT NULL,
+                    miktar REAL NOT NULL,
+                    oncelik INTEGER NOT NULL DEFAULT 0,
+                    durum TEXT NOT NULL DEFAULT 'BEKLİYOR',
+                    sonuc TEXT,
+                    eklenme TEXT DEFAULT (datetime('now', 'localtime')),
+                    islenme TEXT
+                )
+            """)
+            # Kuyruk işçisi yalnızca bekleyenleri öncelik/FIFO sırasıyla tarar.
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_siparis_kuyrugu_bekleyen ON siparis_kuyrugu (durum, oncelik DESC, id)")
+            # Değişiklik günlüğü: açık istemciler yalnızca son imleçlerinden sonraki satırları okur.
+            # AUTOINCREMENT sayesinde seq hiçbir zaman geri gitmez.
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS degisiklik_gunlugu (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    tablo TEXT NOT NULL,
+                    islem TEXT NOT NULL,
+                    kayit_id INTEGER,
+                    urun_ad TEXT
+                )
+            """)
+            for tablo, kayit_id, urun_ad in (("malzemeler", "id", "NULL"),
+                                             ("tarifler", "malzeme_id", "urun_ad"),
+                                             ("islem_gecmisi", "id", "NULL")):
+                for islem, satir in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+                    urun_ifadesi = f"{satir}.{urun_ad}" if urun_ad != "NULL" else "NULL"
+                    cursor.execute(f"""
+                        CREATE TRIGGER IF NOT EXISTS trg_{tablo}_{islem.lower()}
+                        AFTER {islem} ON {tablo}
+                        BEGIN
+                            INSERT INTO degisiklik_gunlugu (tablo, islem, kayit_id, urun_ad)
+                            VALUES ('{tablo}', '{islem}', {satir}.{kayit_id}, {urun_ifadesi});
+                        END
+                    """)
+            self.arama_destekleniyor = self._arama_indeksi_olustur(cursor)
+            self._gunlugu_buda(cursor)
             conn.commit()
 
+    @staticmethod
+    def _gunlugu_buda(cursor, saklama=DEGISIKLIK_SAKLAMA_SAYISI):
+        # Önce yalnızca okunur; günlük sınırın altındaysa yazma kilidi hiç alınmaz.
+        cursor.execute("SELECT MIN(seq), MAX(seq) FROM degisiklik_gunlugu")
+        en_kucuk, en_buyuk = cursor.fetchone()
+        if en_buyuk is None or en_buyuk - en_kucuk < saklama:
+            return False
+        cursor.execute("DELETE FROM degisiklik_gunlugu WHERE seq <= ?", (en_buyuk - saklama,))
+        return True
+
+    def degisiklik_gunlugunu_buda(self):
+        """Günlüğün yalnızca en yeni DEGISIKLIK_SAKLAMA_SAYISI kaydını tutar; uygulama açıkken periyodik çağrılır."""
+        with veritabani_baglantisi(self.db_yolu, sessiz=True) as conn:
+            if self._gunlugu_buda(conn.cursor()):
+                conn.commit()
+
+    def _arama_indeksi_olustur(self, cursor):
+        """
+        İşlem geçmişi için FTS5 indeksi. unicode61 'İ/I' harflerini 'i'ye, 'ş, ç, ğ, ö, ü'yü
+        aksansız hallerine indirir ama 'ı'yı ayrı bırakır; bu yüzden indekse 'ı' -> 'i'
+        dönüştürülmüş metin yazılır. Dönüşüm tek karakteri tek karaktere çevirdiği için
+        vurgu konumları orijinal metne birebir aktarılabilir.
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'islem_gecmisi_fts'")
+        yeni = cursor.fetchone() is None
+        try:
+            cursor.execute("""
+                CREATE VIEW IF NOT EXISTS islem_gecmisi_arama_kaynagi AS
+                SELECT id, replace(islem_tipi, 'ı', 'i') AS islem_tipi, replace(aciklama, 'ı', 'i') AS aciklama
+                FROM islem_gecmisi
+            """)
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS islem_gecmisi_fts USING fts5(
+                    islem_tipi, aciklama,
+                    content='islem_gecmisi_arama_kaynagi', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+            """)
+        except sqlite3.OperationalError:
+            return False    # SQLite FTS5 desteği olmadan derlenmiş; arama LIKE ile yapılır
+        ekle = """
+            INSERT INTO islem_gecmisi_fts (rowid, islem_tipi, aciklama)
+            VALUES (NEW.id, replace(NEW.islem_tipi, 'ı', 'i'), replace(NEW.aciklama, 'ı', 'i'));
+        """
+        sil = """
+            INSERT INTO islem_gecmisi_fts (islem_gecmisi_fts, rowid, islem_tipi, aciklama)
+            VALUES ('delete', OLD.id, replace(OLD.islem_tipi, 'ı', 'i'), replace(OLD.aciklama, 'ı', 'i'));
+        """
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_islem_gecmisi_fts_ekle AFTER INSERT ON islem_gecmisi BEGIN {ekle} END")
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_islem_gecmisi_fts_sil AFTER DELETE ON islem_gecmisi BEGIN {sil} END")
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_islem_gecmisi_fts_guncelle AFTER UPDATE ON islem_gecmisi BEGIN {sil} {ekle} END")
+        if yeni:
+            # Mevcut veritabanındaki geçmiş ilk açılışta bir kez indekslenir.
+            cursor.execute("INSERT INTO islem_gecmisi_fts (islem_gecmisi_fts) VALUES ('rebuild')")
+        return True
+
     def _baslangic_kontrol(self):
         """Veritabanı doluysa örnek veri eklemeyi atlar."""
-        with veritabani_baglantisi() as conn:
+        with veritabani_baglantisi(self.db_yolu) as conn:
             cursor = conn.cursor()
             try:
                 cursor.execute("SELECT count(*) FROM malzemeler")
@@ -86,7 +298,7 @@ class Veritabani:
 
     def _ornek_veri_ekle(self):
         # Sadece veritabanı sıfırdan oluşturulursa çalışır
-        with veritabani_baglantisi() as conn:
+        with veritabani_baglantisi(self.db_yolu) as conn:
             cursor = conn.cursor()
             ornek_malzemeler = [
                 ("Beyaz Kumaş (metre)", 100.0, 20), 
@@ -104,24 +316,24 @@ class Veritabani:
     # --- OKUMA VE YAZMA FONKSİYONLARI ---
 
     def malzemeleri_oku(self):
-        with veritabani_baglantisi() as conn:
+        with veritabani_baglantisi(self.db_yolu) as conn:
             cursor = conn.cursor()
             # Kritik stoktakiler (miktar <= esik) listenin en başında görünür
             cursor.execute("""
-                SELECT id, ad, miktar, kritik_esik 
+                SELECT id, ad, miktar, kritik_esik, birim_maliyet 
                 FROM malzemeler 
                 ORDER BY (miktar <= kritik_esik) DESC, ad ASC
             """)
             return cursor.fetchall()
 
     def tarifleri_cek(self):
-        with veritabani_baglantisi() as conn:
+        with veritabani_baglantisi(self.db_yolu) as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT DISTINCT urun_ad FROM tarifler ORDER BY urun_ad")
             return [row[0] for row in cursor.fetchall()]
 
     def tarif_bilesenlerini_cek(self, urun_ad):
-        with veritabani_baglantisi() as conn:
+        with veritabani_baglantisi(self.db_yolu) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT t.malzeme_id, m.ad, t.kullanilan_adet 
@@ -132,62 +344,224 @@ class Veritabani:
             return cursor.fetchall()
 
     def kritik_sayisi_hesapla(self):
-        with veritabani_baglantisi() as conn:
+        with veritabani_baglantisi(self.db_yolu) as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT COUNT(*) FROM malzemeler WHERE miktar <= kritik_esik")
             return cursor.fetchone()[0]
 
     def islem_gecmisi_oku(self):
-        with veritabani_baglantisi() as conn:
+        with veritabani_baglantisi(self.db_yolu) as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT id, tarih, islem_tipi, aciklama, miktar_degisim FROM islem_gecmisi ORDER BY id DESC LIMIT 100")
             return cursor.fetchall()
 
+    def gecmiste_ara(self, sorgu, limit=100):
+        """
+        İşlem geçmişinde tam metin araması. Her kelime ön ek olarak aranır ('kumaş' -> 'kumaşı').
+        Sonuçlar ilgiye (bm25) göre sıralı (id, tarih, islem_tipi, ozet, miktar_degisim) satırlarıdır;
+        ozet, eşleşen kelimeleri « » ile işaretlenmiş açıklamadır. Eşleşme sayısı
+        ARAMA_SIRALAMA_SINIRI'nı aşarsa (ör. 'güncellendi') bm25 tüm eşleşmeler için hesaplanmaz,
+        en yeni kayıtlar döndürülür.
+        """
+        return self._puanli_ara(sorgu, limit)[0]
+
+    def _puanli_ara(self, sorgu, limit, sessiz=False):
+        """gecmiste_ara satırları ve bm25 puanları; bm25 kullanılmadıysa puanlar None'dır."""
+        kelimeler = [k.replace('"', '""') for k in sorgu.replace('ı', 'i').split()]
+        if not kelimeler:
+            return [], None
+        with veritabani_baglantisi(self.db_yolu, sessiz=sessiz) as conn:
+            cursor = conn.cursor()
+            if not self.arama_destekleniyor:
+                kosul = " AND ".join("aciklama LIKE ?" for _ in kelimeler)
+                cursor.execute(f"""
+                    SELECT id, tarih, islem_tipi, aciklama, miktar_degisim FROM islem_gecmisi
+                    WHERE {kosul} ORDER BY id DESC LIMIT ?
+                """, [f"%{k}%" for k in sorgu.split()] + [limit])
+                return cursor.fetchall(), None
+            ifade = " ".join(f'"{k}"*' for k in kelimeler)
+            # Önce ucuz bir yoklama: en yeni eşleşmeler rowid sırasıyla doğrudan indeksten okunur.
+            cursor.execute("""
+                SELECT rowid FROM islem_gecmisi_fts WHERE islem_gecmisi_fts MATCH ?
+                ORDER BY rowid DESC LIMIT ?
+            """, (ifade, ARAMA_SIRALAMA_SINIRI + 1))
+            idler = [r[0] for r in cursor.fetchall()]
+            if not idler:
+                return [], []
+            if len(idler) <= ARAMA_SIRALAMA_SINIRI:
+                kosul, siralama, alt_sinir = "", "islem_gecmisi_fts.rank, g.id DESC", None
+            else:
+                kosul, siralama, alt_sinir = "AND islem_gecmisi_fts.rowid >= ?", "g.id DESC", idler[min(limit, len(idler)) - 1]
+            cursor.execute(f"""
+                SELECT g.id, g.tarih, g.islem_tipi, g.aciklama, g.miktar_degisim,
+                       highlight(islem_gecmisi_fts, 1, char(2), char(3)), islem_gecmisi_fts.rank
+                FROM islem_gecmisi_fts
+                JOIN islem_gecmisi g ON g.id = islem_gecmisi_fts.rowid
+                WHERE islem_gecmisi_fts MATCH ? {kosul}
+                ORDER BY {siralama}
+                LIMIT ?
+            """, [ifade] + ([alt_sinir] if alt_sinir is not None else []) + [limit])
+            satirlar = cursor.fetchall()
+            return ([(i, tarih, tip, _vurguyu_aktar(vurgulu, aciklama), degisim)
+                     for i, tarih, tip, aciklama, degisim, vurgulu, _ in satirlar],
+                    [puan for *_, puan in satirlar] if alt_sinir is None else None)
+
     def islem_kaydet(self, islem_tipi, aciklama, miktar_degisim=0):
         try:
-            with veritabani_baglantisi() as conn:
+            with veritabani_baglantisi(self.db_yolu) as conn:
                 conn.execute("INSERT INTO islem_gecmisi (islem_tipi, aciklama, miktar_degisim) VALUES (?, ?, ?)", 
                              (islem_tipi, aciklama, miktar_degisim))
                 conn.commit()
         except: pass
 
+    def siparis_kuyrugu_oku(self, limit=100):
+        with veritabani_baglantisi(self.db_yolu) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, eklenme, urun_ad, miktar, oncelik, durum, sonuc
+                FROM siparis_kuyrugu ORDER BY id DESC LIMIT ?
+            """, (limit,))
+            return cursor.fetchall()
+
+    def siparis_kuyrugu_ozet(self):
+        with veritabani_baglantisi(self.db_yolu) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT durum, COUNT(*) FROM siparis_kuyrugu GROUP BY durum")
+            return dict(cursor.fetchall())
+
+    def kuyruk_hedefi(self, urun_ad):
+        """Siparişin hangi veritabanının kuyruğuna yazılacağını döndürür."""
+        return self, urun_ad
+
+    def degisiklik_imleci(self):
+        with veritabani_baglantisi(self.db_yolu, sessiz=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM degisiklik_gunlugu")
+            return cursor.fetchone()[0]
+
+    def degisiklikleri_cek(self, imlec, limit=DEGISIKLIK_LIMITI):
+        """
+        İmleçten sonraki değişiklikleri (yeni_imlec, [(tablo, islem, kayit_id, urun_ad), ...]) olarak döndürür.
+        İmleç budanmış/geçersizse, değişiklik sayısı limiti aşıyorsa veya arada toplu silme (SIFIRLA)
+        varsa None döner; istemci tam yenileme yapmalıdır.
+        """
+        with veritabani_baglantisi(self.db_yolu, sessiz=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT MIN(seq), MAX(seq) FROM degisiklik_gunlugu")
+            en_kucuk, en_buyuk = cursor.fetchone()
+            if en_buyuk is None:
+                return (0, []) if imlec == 0 else None
+            if imlec > en_buyuk or imlec < en_kucuk - 1:
+                return None
+            cursor.execute("""
+                SELECT seq, tablo, islem, kayit_id, urun_ad FROM degisiklik_gunlugu
+                WHERE seq > ? ORDER BY seq LIMIT ?
+            """, (imlec, limit + 1))
+            satirlar = cursor.fetchall()
+            if len(satirlar) > limit or any(r[2] == 'SIFIRLA' for r in satirlar):
+                return None
+            if not satirlar:
+                return imlec, []
+            return satirlar[-1][0], [r[1:] for r in satirlar]
+
+    def malzemeleri_getir(self, idler):
+        idler = list(idler)
+        if not idler:
+            return []
+        with veritabani_baglantisi(self.db_yolu) as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT id, ad, miktar, kritik_esik, birim_maliyet FROM malzemeler WHERE id IN ({','.join('?' * len(idler))})", idler)
+            return cursor.fetchall()
+
+    def islem_kayitlarini_getir(self, idler):
+        idler = list(idler)
+        if not idler:
+            return []
+        with veritabani_baglantisi(self.db_yolu) as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT id, tarih, islem_tipi, aciklama, miktar_degisim FROM islem_gecmisi
+                WHERE id IN ({','.join('?' * len(idler))}) ORDER BY id
+            """, idler)
+            return cursor.fetchall()
+
+    def birim_maliyetleri_oku(self, idler=None):
+        with veritabani_baglantisi(self.db_yolu) as conn:
+            cursor = conn.cursor()
+            if idler is None:
+                cursor.execute("SELECT id, birim_maliyet FROM malzemeler")
+            else:
+                idler = list(idler)
+                cursor.execute(f"SELECT id, birim_maliyet FROM malzemeler WHERE id IN ({','.join('?' * len(idler))})", idler)
+            return cursor.fetchall()
+
+    def tarif_satirlarini_oku(self, urunler=None):
+        with veritabani_baglantisi(self.db_yolu) as conn:
+            cursor = conn.cursor()
+            if urunler is None:
+                cursor.execute("SELECT urun_ad, malzeme_id, kullanilan_adet FROM tarifler")
+            else:
+                urunler = list(urunler)
+                cursor.execute(f"SELECT urun_ad, malzeme_id, kullanilan_adet FROM tarifler WHERE urun_ad IN ({','.join('?' * len(urunler))})", urunler)
+            return cursor.fetchall()
+
+    def envanter_goruntusu(self, onbellek=True):
+        """Analiz ve dışa aktarımlar için kolonsal anlık görüntü (bkz. EnvanterGoruntusu)."""
+        return EnvanterGoruntusu.yukle(self.db_yolu, ONBELLEK_DIR if onbellek else None)
+
     # --- İŞLEM FONKSİYONLARI ---
 
+    @staticmethod
+    def _siparis_hesapla(urun_adi, siparis_miktari, tarif_listesi, stok):
+        """
+        Reçete ve stok kontrolü; tekli sipariş ve kuyruk işçisi aynı kuralları kullanır.
+        stok: {malzeme_id: [ad, miktar]}. Hata varsa mesajı, yoksa
+        ([(malzeme_id, düşülecek), ...], geçmiş açıklaması) döndürür.
+        """
+        # 1. Reçete Kontrolü
+        if not tarif_listesi:
+            return f"Uyarı: '{urun_adi}' için reçete/bileşen bulunamadı."
+
+        # 2. Stok Yeterlilik Kontrolü
+        yetersiz = []
+        for mid, adet in tarif_listesi:
+            gerekli = adet * siparis_miktari
+            if mid in stok and stok[mid][1] < gerekli:
+                ad, mevcut = stok[mid]
+                yetersiz.append(f"- {ad}: Mevcut {mevcut}, Gerekli {gerekli:.2f}")
+
+        if yetersiz:
+            return "YETERSİZ STOK:\n" + "\n".join(yetersiz)
+
+        dusumler = [(mid, adet * siparis_miktari) for mid, adet in tarif_listesi if mid in stok]
+        return dusumler, f"'{urun_adi}' ({siparis_miktari} adet) üretildi."
+
     def siparis_isleme_ve_stok_dus(self, urun_adi, siparis_miktari):
         """
         Database Locked hatasını önleyen tek-transaction yapısı.
         """
-        with veritabani_baglantisi() as conn:
+        with veritabani_baglantisi(self.db_yolu) as conn:
             cursor = conn.cursor()
             
-            # 1. Reçete Kontrolü
             cursor.execute("SELECT malzeme_id, kullanilan_adet FROM tarifler WHERE urun_ad = ?", (urun_adi,))
             tarif_listesi = cursor.fetchall()
-            
-            if not tarif_listesi:
-                return f"Uyarı: '{urun_adi}' için reçete/bileşen bulunamadı."
-
-            # 2. Stok Yeterlilik Kontrolü
-            yetersiz = []
-            for mid, adet in tarif_listesi:
-                gerekli = adet * siparis_miktari
+            stok = {}
+            for mid, _ in tarif_listesi:
                 cursor.execute("SELECT ad, miktar FROM malzemeler WHERE id = ?", (mid,))
                 res = cursor.fetchone()
                 if res:
-                    ad, stok = res
-                    if stok < gerekli:
-                        yetersiz.append(f"- {ad}: Mevcut {stok}, Gerekli {gerekli:.2f}")
+                    stok[mid] = list(res)
 
-            if yetersiz:
-                return "YETERSİZ STOK:\n" + "\n".join(yetersiz)
+            sonuc = self._siparis_hesapla(urun_adi, siparis_miktari, tarif_listesi, stok)
+            if isinstance(sonuc, str):
+                return sonuc
+            dusumler, aciklama = sonuc
 
             # 3. Stok Düşme ve Kayıt (Aynı bağlantıda)
             try:
-                for mid, adet in tarif_listesi:
-                    dusulecek = adet * siparis_miktari
+                for mid, dusulecek in dusumler:
                     cursor.execute("UPDATE malzemeler SET miktar = miktar - ? WHERE id = ?", (dusulecek, mid))
                 
-                aciklama = f"'{urun_adi}' ({siparis_miktari} adet) üretildi."
                 cursor.execute("INSERT INTO islem_gecmisi (islem_tipi, aciklama, miktar_degisim) VALUES (?, ?, ?)", 
                              ("SİPARİŞ", aciklama, 0))
                 
@@ -196,11 +570,11 @@ class Veritabani:
             except Exception as e:
                 return f"İşlem sırasında hata: {e}"
 
-    def malzeme_ekle(self, ad, miktar, kritik_esik):
+    def malzeme_ekle(self, ad, miktar, kritik_esik, birim_maliyet=0):
         try:
-            with veritabani_baglantisi() as conn:
-                conn.execute("INSERT INTO malzemeler (ad, miktar, kritik_esik) VALUES (?, ?, ?)", 
-                               (ad, miktar, kritik_esik))
+            with veritabani_baglantisi(self.db_yolu) as conn:
+                conn.execute("INSERT INTO malzemeler (ad, miktar, kritik_esik, birim_maliyet) VALUES (?, ?, ?, ?)", 
+                               (ad, miktar, kritik_esik, birim_maliyet))
                 conn.commit()
             self.islem_kaydet("YENİ MALZEME", f"'{ad}' eklendi.", miktar)
             return True
@@ -212,7 +586,7 @@ class Veritabani:
     def malzeme_kaldir(self, malzeme_id):
         try:
             ad = "Bilinmeyen"
-            with veritabani_baglantisi() as conn:
+            with veritabani_baglantisi(self.db_yolu) as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT ad FROM malzemeler WHERE id=?", (malzeme_id,))
                 res = cursor.fetchone()
@@ -227,7 +601,7 @@ class Veritabani:
     def stok_guncelle(self, id_val, miktar_degisim):
         try:
             ad = ""
-            with veritabani_baglantisi() as conn:
+            with veritabani_baglantisi(self.db_yolu) as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT ad, miktar FROM malzemeler WHERE id = ?", (id_val,))
                 sonuc = cursor.fetchone()
@@ -245,9 +619,26 @@ class Veritabani:
         except Exception as e:
             return f"Hata: {e}"
 
+    def birim_maliyet_guncelle(self, id_val, birim_maliyet):
+        try:
+            if birim_maliyet < 0:
+                return "Hata: Birim maliyet negatif olamaz."
+            with veritabani_baglantisi(self.db_yolu) as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT ad FROM malzemeler WHERE id = ?", (id_val,))
+                sonuc = cursor.fetchone()
+                if not sonuc:
+                    return "Malzeme bulunamadı."
+                conn.execute("UPDATE malzemeler SET birim_maliyet = ? WHERE id = ?", (birim_maliyet, id_val))
+                conn.commit()
+            self.islem_kaydet("MALİYET GÜNCELLEME", f"'{sonuc[0]}' birim maliyeti {birim_maliyet:.2f} oldu.")
+            return True
+        except Exception as e:
+            return f"Hata: {e}"
+
     def tarif_bilesen_ekle(self, urun_ad, malzeme_id, kullanilan_adet):
         try:
-            with veritabani_baglantisi() as conn:
+            with veritabani_baglantisi(self.db_yolu) as conn:
                 conn.execute("INSERT OR REPLACE INTO tarifler VALUES (?, ?, ?)", (urun_ad, malzeme_id, kullanilan_adet))
                 conn.commit()
                 return True
@@ -256,7 +647,7 @@ class Veritabani:
 
     def recete_bileseni_kaldir(self, urun_ad, malzeme_id):
         try:
-            with veritabani_baglantisi() as conn:
+            with veritabani_baglantisi(self.db_yolu) as conn:
                 conn.execute("DELETE FROM tarifler WHERE urun_ad = ? AND malzeme_id = ?", (urun_ad, malzeme_id))
                 conn.commit()
                 return True
@@ -265,7 +656,7 @@ class Veritabani:
 
     def recete_sil(self, urun_ad):
         try:
-            with veritabani_baglantisi() as conn:
+            with veritabani_baglantisi(self.db_yolu) as conn:
                 conn.execute("DELETE FROM tarifler WHERE urun_ad = ?", (urun_ad,))
                 conn.commit()
                 return True
@@ -274,8 +665,14 @@ class Veritabani:
             
     def gecmisi_temizle(self):
         try:
-            with veritabani_baglantisi() as conn:
+            with veritabani_baglantisi(self.db_yolu) as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                onceki = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM degisiklik_gunlugu").fetchone()[0]
                 conn.execute("DELETE FROM islem_gecmisi")
+                # Tetikleyicinin satır başına yazdığı kayıtlar tek bir SIFIRLA kaydıyla değiştirilir;
+                # istemciler bunu görünce tam yenileme yapar.
+                conn.execute("DELETE FROM degisiklik_gunlugu WHERE seq > ? AND tablo = 'islem_gecmisi'", (onceki,))
+                conn.execute("INSERT INTO degisiklik_gunlugu (tablo, islem) VALUES ('islem_gecmisi', 'SIFIRLA')")
                 conn.execute("DELETE FROM sqlite_sequence WHERE name='islem_gecmisi'")
                 conn.commit()
                 return True
@@ -283,13 +680,1235 @@ class Veritabani:
             return f"Hata: {e}"
 
 
+# ==========================================
+# 1.1 ÇOKLU ATÖLYE (Federasyon)
+# ==========================================
+
+class FedereVeritabani(Veritabani):
+    """
+    Her atölyenin kendi veritabanını tek bir Veritabani gibi sunar.
+    Okumalar atölyelere paralel dağıtılır (toplam süre ~ en yavaş atölye),
+    yazmalar ilgili kaydın ait olduğu atölyeye yönlendirilir.
+    Malzeme ID'leri 'sira * FEDERE_ID_CARPANI + yerel_id' olarak, ürün adları
+    'urun [atölye]' biçiminde tekilleştirilir; arayüz değişmeden çalışır.
+    İlk atölye ana atölyedir, yeni malzemeler oraya eklenir.
+    """
+
+    def __init__(self, siteler):
+        if not siteler:
+            raise ValueError("En az bir atölye tanımlanmalıdır.")
+        # Açılamayan atölye (ör. bağlı olmayan ağ sürücüsü) açılışı engellemez, bu oturumda dışarıda kalır.
+        self.acilamayan_siteler = [ad for ad, yol in siteler if not self._site_acilabilir_mi(yol)]
+        siteler = [(ad, yol) for ad, yol in siteler if ad not in self.acilamayan_siteler]
+        if not siteler:
+            raise ValueError("Hiçbir atölye veritabanı açılamadı: " + ", ".join(self.acilamayan_siteler))
+        self.site_adlari = [ad for ad, _ in siteler]
+        self.siteler = [Veritabani(yol) for _, yol in siteler]
+        self._havuz = ThreadPoolExecutor(max_workers=min(len(siteler), FEDERE_ISCI_SAYISI), thread_name_prefix="atolye")
+        self.erisilemeyen_siteler = []
+        super().__init__(siteler[0][1])
+
+    @staticmethod
+    def _site_acilabilir_mi(yol):
+        try:
+            conn = sqlite3.connect(yol, timeout=2)
+            try:
+                conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+            finally:
+                conn.close()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def erisilemeyenler(self):
+        """Açılışta açılamayan ve son sorguda yanıt vermeyen atölyeler."""
+        return self.acilamayan_siteler + [s for s in self.erisilemeyen_siteler if s not in self.acilamayan_siteler]
+
+    # --- YÖNLENDİRME YARDIMCILARI ---
+
+    @staticmethod
+    def _global_id(sira, yerel_id):
+        return sira * FEDERE_ID_CARPANI + yerel_id
+
+    def _id_coz(self, global_id):
+        sira, yerel_id = divmod(int(global_id), FEDERE_ID_CARPANI)
+        if sira >= len(self.siteler):
+            raise ValueError(f"Geçersiz malzeme ID: {global_id}")
+        return sira, yerel_id
+
+    def _ad_coz(self, nitelikli_ad):
+        """'urun [atölye]' -> (sira, urun). Atölye belirtilmemişse ana atölye kullanılır."""
+        if nitelikli_ad.endswith("]") and " [" in nitelikli_ad:
+            urun, site = nitelikli_ad[:-1].rsplit(" [", 1)
+            if site in self.site_adlari:
+                return self.site_adlari.index(site), urun
+        return 0, nitelikli_ad
+
+    def _site_sorgula(self, sira, sql, params=()):
+        # Her işçi kendi bağlantısını açar; messagebox ana thread dışında çağrılmamalıdır.
+        conn = sqlite3.connect(self.siteler[sira].db_yolu)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def _paralel_sorgula(self, sql, params=()):
+        """Sorguyu tüm atölyelerde paralel çalıştırır; [(sira, satirlar), ...] döndürür."""
+        isler = [(sira, self._havuz.submit(self._site_sorgula, sira, sql, params)) for sira in range(len(self.siteler))]
+        sonuclar, erisilemeyen = [], []
+        for sira, is_ in isler:
+            try:
+                sonuclar.append((sira, is_.result()))
+            except sqlite3.Error:
+                erisilemeyen.append(self.site_adlari[sira])
+        self.erisilemeyen_siteler = erisilemeyen
+        return sonuclar
+
+    def _site_grubunu_bagla(self, siralar):
+        """
+        Bir grup atölyeyi salt okunur olarak tek bağlantıya ATTACH eder ve TEMP UNION ALL
+        görünümleri oluşturur: tum_malzemeler, site_kritik_sayilari. Bağlanamayan
+        atölyeler atlanır; (bağlantı, erişilemeyen atölyeler) döndürür.
+        """
+        conn = sqlite3.connect(":memory:")
+        bagli, erisilemeyen = [], []
+        for sira in siralar:
+            uri = Path(os.path.abspath(self.siteler[sira].db_yolu)).as_uri() + "?mode=ro"
+            try:
+                conn.execute(f"ATTACH DATABASE ? AS s{sira}", (uri,))
+                conn.execute(f"SELECT 1 FROM s{sira}.malzemeler LIMIT 1").fetchall()
+                bagli.append(sira)
+            except sqlite3.Error:
+                erisilemeyen.append(self.site_adlari[sira])
+        if bagli:
+            parcalar = []
+            for sira in bagli:
+                site_sql = self.site_adlari[sira].replace("'", "''")
+                parcalar.append(f"SELECT '{site_sql}' AS site, {sira} AS site_sira, id, ad, miktar, kritik_esik FROM s{sira}.malzemeler")
+            conn.execute(f"CREATE TEMP VIEW tum_malzemeler AS {' UNION ALL '.join(parcalar)}")
+            conn.execute("""
+                CREATE TEMP VIEW site_kritik_sayilari AS
+                SELECT site, site_sira, SUM(miktar <= kritik_esik) AS kritik_sayisi, COUNT(*) AS malzeme_sayisi
+                FROM tum_malzemeler GROUP BY site_sira
+            """)
+        return conn, bagli, erisilemeyen
+
+    def _grup_sorgula(self, siralar, sql):
+        conn, bagli, erisilemeyen = self._site_grubunu_bagla(siralar)
+        try:
+            return (conn.execute(sql).fetchall() if bagli else []), erisilemeyen
+        finally:
+            conn.close()
+
+    def _birlesik_sorgula(self, sql):
+        """
+        Sorguyu UNION görünümleri üzerinde çalıştırır. SQLite bir bağlantıya en fazla
+        FEDERE_ATTACH_SINIRI (varsayılan 10) veritabanı bağlayabildiğinden atölyeler bu
+        boyutta gruplara bölünür ve gruplar paralel sorgulanır; satırlar birleştirilmeden döner.
+        """
+        boyut = FEDERE_ATTACH_SINIRI
+        gruplar = [range(i, min(i + boyut, len(self.siteler))) for i in range(0, len(self.siteler), boyut)]
+        isler = [self._havuz.submit(self._grup_sorgula, grup, sql) for grup in gruplar]
+        satirlar, erisilemeyen = [], []
+        for is_ in isler:
+            grup_satirlari, grup_erisilemeyen = is_.result()
+            satirlar.extend(grup_satirlari)
+            erisilemeyen.extend(grup_erisilemeyen)
+        self.erisilemeyen_siteler = erisilemeyen
+        return satirlar
+
+    def konsolide_stok(self):
+        """Aynı adlı malzemelerin tüm atölyelerdeki toplamı: (ad, toplam miktar, atölye sayısı, kritik atölye sayısı)."""
+        toplamlar = {}
+        for ad, miktar, site_sayisi, kritik in self._birlesik_sorgula("""
+                SELECT ad, SUM(miktar), COUNT(*), SUM(miktar <= kritik_esik)
+                FROM tum_malzemeler GROUP BY ad
+                """):
+            # Aynı ad farklı ATTACH gruplarında olabilir; grup sonuçları burada toplanır.
+            onceki = toplamlar.get(ad, (0, 0, 0))
+            toplamlar[ad] = (onceki[0] + miktar, onceki[1] + site_sayisi, onceki[2] + kritik)
+        return [(ad, *degerler) for ad, degerler in sorted(toplamlar.items())]
+
+    def site_kritik_sayilari(self):
+        """Atölye başına (atölye, kritik sayısı, malzeme sayısı); erişilemeyenler None ile döner."""
+        sayilar = {sira: (kritik, toplam) for _, sira, kritik, toplam in self._birlesik_sorgula(
+            "SELECT site, site_sira, kritik_sayisi, malzeme_sayisi FROM site_kritik_sayilari")}
+        return [(site, *sayilar.get(sira, (None, None))) for sira, site in enumerate(self.site_adlari)] + \
+               [(site, None, None) for site in self.acilamayan_siteler]
+
+    # --- OKUMA (paralel) ---
+
+    def malzemeleri_oku(self):
+        veriler = []
+        for sira, satirlar in self._paralel_sorgula("SELECT id, ad, miktar, kritik_esik, birim_maliyet FROM malzemeler"):
+            site = self.site_adlari[sira]
+            veriler.extend((self._global_id(sira, mid), f"{ad} [{site}]", miktar, esik, maliyet)
+                           for mid, ad, miktar, esik, maliyet in satirlar)
+        veriler.sort(key=lambda r: (r[2] > r[3], r[1]))
+        return veriler
+
+    def tarifleri_cek(self):
+        urunler = []
+        for sira, satirlar in self._paralel_sorgula("SELECT DISTINCT urun_ad FROM tarifler"):
+            urunler.extend(f"{r[0]} [{self.site_adlari[sira]}]" for r in satirlar)
+        return sorted(urunler)
+
+    def kritik_sayisi_hesapla(self):
+        return sum(satir[0] for satir in self._birlesik_sorgula("SELECT kritik_sayisi FROM site_kritik_sayilari"))
+
+    def islem_gecmisi_oku(self):
+        veriler = []
+        sql = "SELECT id, tarih, islem_tipi, aciklama, miktar_degisim FROM islem_gecmisi ORDER BY id DESC LIMIT 100"
+        for sira, satirlar in self._paralel_sorgula(sql):
+            site = self.site_adlari[sira]
+            veriler.extend((self._global_id(sira, i), tarih, tip, f"[{site}] {aciklama}", degisim) for i, tarih, tip, aciklama, degisim in satirlar)
+        veriler.sort(key=lambda r: r[1] or "", reverse=True)
+        return veriler[:100]
+
+    def _sitelerde_calistir(self, islev):
+        """
+        islev(sira, site_db) her atölyede paralel çalışır; {sira: sonuc} döner. Hata veren
+        atölyeler atlanır ve erisilemeyen_siteler'e yazılır; bir atölye turun tamamını bozmaz.
+        """
+        isler = [(sira, self._havuz.submit(islev, sira, site_db)) for sira, site_db in enumerate(self.siteler)]
+        sonuclar, erisilemeyen = {}, []
+        for sira, is_ in isler:
+            try:
+                sonuclar[sira] = is_.result()
+            except sqlite3.Error:
+                erisilemeyen.append(self.site_adlari[sira])
+        self.erisilemeyen_siteler = erisilemeyen
+        return sonuclar
+
+    def degisiklik_imleci(self):
+        # Federasyonda imleç, her atölyenin kendi imlecinden oluşan bir demettir; erişilemeyen atölyenin imleci None'dır.
+        sonuclar = self._sitelerde_calistir(lambda sira, site_db: site_db.degisiklik_imleci())
+        return tuple(sonuclar.get(sira) for sira in range(len(self.siteler)))
+
+    def degisiklikleri_cek(self, imlec, limit=DEGISIKLIK_LIMITI):
+        def cek(sira, site_db):
+            if imlec[sira] is None:
+                # Önceden erişilemeyen atölye geri geldi; verisi hiç yüklenmediği için tam yenileme gerekir.
+                site_db.degisiklik_imleci()
+                return None
+            return site_db.degisiklikleri_cek(imlec[sira], limit)
+
+        sonuclar = self._sitelerde_calistir(cek)
+        # Erişilemeyen atölyenin imleci değişmez; geri geldiğinde kaldığı yerden devam eder.
+        yeni_imlec, degisiklikler = list(imlec), []
+        for sira in sorted(sonuclar):
+            sonuc = sonuclar[sira]
+            if sonuc is None:
+                return None
+            yeni_imlec[sira] = sonuc[0]
+            site = self.site_adlari[sira]
+            for tablo, islem, kayit_id, urun_ad in sonuc[1]:
+                if urun_ad is not None:
+                    urun_ad = f"{urun_ad} [{site}]"
+                degisiklikler.append((tablo, islem, self._global_id(sira, kayit_id), urun_ad))
+        return tuple(yeni_imlec), degisiklikler
+
+    def _site_bazinda(self, idler):
+        gruplar = {}
+        for global_id in idler:
+            sira, yerel_id = self._id_coz(global_id)
+            gruplar.setdefault(sira, []).append(yerel_id)
+        return gruplar.items()
+
+    def malzemeleri_getir(self, idler):
+        veriler = []
+        for sira, yerel_idler in self._site_bazinda(idler):
+            site = self.site_adlari[sira]
+            veriler.extend((self._global_id(sira, mid), f"{ad} [{site}]", miktar, esik, maliyet)
+                           for mid, ad, miktar, esik, maliyet in self.siteler[sira].malzemeleri_getir(yerel_idler))
+        return veriler
+
+    def islem_kayitlarini_getir(self, idler):
+        veriler = []
+        for sira, yerel_idler in self._site_bazinda(idler):
+            site = self.site_adlari[sira]
+            veriler.extend((self._global_id(sira, i), tarih, tip, f"[{site}] {aciklama}", degisim)
+                           for i, tarih, tip, aciklama, degisim in self.siteler[sira].islem_kayitlarini_getir(yerel_idler))
+        return veriler
+
+    def birim_maliyetleri_oku(self, idler=None):
+        if idler is None:
+            return [(self._global_id(sira, mid), maliyet)
+                    for sira, satirlar in self._paralel_sorgula("SELECT id, birim_maliyet FROM malzemeler")
+                    for mid, maliyet in satirlar]
+        veriler = []
+        for sira, yerel_idler in self._site_bazinda(idler):
+            veriler.extend((self._global_id(sira, mid), maliyet) for mid, maliyet in self.siteler[sira].birim_maliyetleri_oku(yerel_idler))
+        return veriler
+
+    def tarif_satirlarini_oku(self, urunler=None):
+        if urunler is None:
+            return [(f"{urun} [{self.site_adlari[sira]}]", self._global_id(sira, mid), adet)
+                    for sira, satirlar in self._paralel_sorgula("SELECT urun_ad, malzeme_id, kullanilan_adet FROM tarifler")
+                    for urun, mid, adet in satirlar]
+        gruplar = {}
+        for nitelikli_ad in urunler:
+            sira, urun = self._ad_coz(nitelikli_ad)
+            gruplar.setdefault(sira, []).append(urun)
+        veriler = []
+        for sira, site_urunleri in gruplar.items():
+            site = self.site_adlari[sira]
+            veriler.extend((f"{urun} [{site}]", self._global_id(sira, mid), adet)
+                           for urun, mid, adet in self.siteler[sira].tarif_satirlarini_oku(site_urunleri))
+        return veriler
+
+    def gecmiste_ara(self, sorgu, limit=100):
+        """
+        Atölyelerde paralel arar. Tüm atölyeler bm25 ile sıraladıysa sonuçlar puana göre,
+        aksi halde (geniş sorgu veya FTS5 yok) tarihe göre birleştirilip limit uygulanır.
+        """
+        isler = [(sira, self._havuz.submit(site_db._puanli_ara, sorgu, limit, True)) for sira, site_db in enumerate(self.siteler)]
+        veriler, hepsi_puanli, erisilemeyen = [], True, []
+        for sira, is_ in isler:
+            try:
+                satirlar, puanlar = is_.result()
+            except sqlite3.Error:
+                erisilemeyen.append(self.site_adlari[sira])
+                continue
+            if puanlar is None:
+                hepsi_puanli, puanlar = False, [0] * len(satirlar)
+            site = self.site_adlari[sira]
+            veriler.extend((puan, (self._global_id(sira, i), tarih, tip, f"[{site}] {ozet}", degisim))
+                           for puan, (i, tarih, tip, ozet, degisim) in zip(puanlar, satirlar))
+        self.erisilemeyen_siteler = erisilemeyen
+        # Önce tarihe göre (yeni -> eski) sıralanır; puan sıralaması kararlı olduğundan eşit puanlarda yeni önde kalır.
+        veriler.sort(key=lambda v: v[1][1] or "", reverse=True)
+        if hepsi_puanli:
+            veriler.sort(key=lambda v: v[0])
+        return [satir for _, satir in veriler[:limit]]
+
+    def tarif_bilesenlerini_cek(self, urun_ad):
+        sira, urun = self._ad_coz(urun_ad)
+        return [(self._global_id(sira, mid), ad, adet) for mid, ad, adet in self.siteler[sira].tarif_bilesenlerini_cek(urun)]
+
+    # --- YAZMA (sahip atölyeye yönlendirilir) ---
+
+    def kuyruk_hedefi(self, urun_ad):
+        sira, urun = self._ad_coz(urun_ad)
+        return self.siteler[sira], urun
+
+    def islem_kaydet(self, islem_tipi, aciklama, miktar_degisim=0):
+        self.siteler[0].islem_kaydet(islem_tipi, aciklama, miktar_degisim)
+
+    def siparis_isleme_ve_stok_dus(self, urun_adi, siparis_miktari):
+        sira, urun = self._ad_coz(urun_adi)
+        return self.siteler[sira].siparis_isleme_ve_stok_dus(urun, siparis_miktari)
+
+    def malzeme_ekle(self, ad, miktar, kritik_esik, birim_maliyet=0):
+        sira, ad = self._ad_coz(ad)
+        return self.siteler[sira].malzeme_ekle(ad, miktar, kritik_esik, birim_maliyet)
+
+    def birim_maliyet_guncelle(self, id_val, birim_maliyet):
+        try:
+            sira, yerel_id = self._id_coz(id_val)
+        except ValueError as e:
+            return f"Hata: {e}"
+        return self.siteler[sira].birim_maliyet_guncelle(yerel_id, birim_maliyet)
+
+    def malzeme_kaldir(self, malzeme_id):
+        try:
+            sira, yerel_id = self._id_coz(malzeme_id)
+        except ValueError as e:
+            return f"Hata: {e}"
+        return self.siteler[sira].malzeme_kaldir(yerel_id)
+
+    def stok_guncelle(self, id_val, miktar_degisim):
+        try:
+            sira, yerel_id = self._id_coz(id_val)
+        except ValueError as e:
+            return f"Hata: {e}"
+        return self.siteler[sira].stok_guncelle(yerel_id, miktar_degisim)
+
+    def tarif_bilesen_ekle(self, urun_ad, malzeme_id, kullanilan_adet):
+        sira, urun = self._ad_coz(urun_ad)
+        try:
+            malzeme_sira, yerel_id = self._id_coz(malzeme_id)
+        except ValueError as e:
+            return f"Hata: {e}"
+        if malzeme_sira != sira:
+            return f"Hata: Malzeme ile reçete aynı atölyede olmalıdır ({self.site_adlari[sira]})."
+        return self.siteler[sira].tarif_bilesen_ekle(urun, yerel_id, kullanilan_adet)
+
+    def recete_bileseni_kaldir(self, urun_ad, malzeme_id):
+        sira, urun = self._ad_coz(urun_ad)
+        try:
+            _, yerel_id = self._id_coz(malzeme_id)
+        except ValueError as e:
+            return f"Hata: {e}"
+        return self.siteler[sira].recete_bileseni_kaldir(urun, yerel_id)
+
+    def recete_sil(self, urun_ad):
+        sira, urun = self._ad_coz(urun_ad)
+        return self.siteler[sira].recete_sil(urun)
+
+    def envanter_goruntusu(self, onbellek=True):
+        """Atölye görüntüleri paralel yüklenip birleştirilir; malzeme ID'leri global ID'dir."""
+        dizin = ONBELLEK_DIR if onbellek else None
+        isler = [(sira, self._havuz.submit(EnvanterGoruntusu.yukle, site_db.db_yolu, dizin)) for sira, site_db in enumerate(self.siteler)]
+        goruntuler, ofsetler, erisilemeyen = [], [], []
+        for sira, is_ in isler:
+            try:
+                goruntuler.append(is_.result())
+                ofsetler.append(self._global_id(sira, 0))
+            except sqlite3.Error:
+                erisilemeyen.append(self.site_adlari[sira])
+        self.erisilemeyen_siteler = erisilemeyen
+        return EnvanterGoruntusu.birlestir(goruntuler, ofsetler)
+
+    def degisiklik_gunlugunu_buda(self):
+        self._sitelerde_calistir(lambda sira, site_db: site_db.degisiklik_gunlugunu_buda())
+
+    def gecmisi_temizle(self):
+        for site_db in self.siteler:
+            res = site_db.gecmisi_temizle()
+            if res is not True:
+                return res
+        return True
+
+
+def siteleri_oku(dosya=SITELER_DOSYASI):
+    """'atölye;veritabanı_yolu' satırlarını okur. Dosya yoksa boş liste döner (tek atölye modu)."""
+    if not os.path.exists(dosya):
+        return []
+    siteler = []
+    with open(dosya, newline='', encoding='utf-8-sig') as f:
+        for satir in csv.reader(f, delimiter=';'):
+            if len(satir) < 2 or not satir[0].strip() or satir[0].startswith('#'):
+                continue
+            yol = satir[1].strip()
+            if not os.path.isabs(yol):
+                yol = os.path.join(BASE_DIR, yol)
+            siteler.append((satir[0].strip(), yol))
+    return siteler
+
+
+# ==========================================
+# 1.2 YEDEKLEME (Online Backup)
+# ==========================================
+
+class YedeklemeYoneticisi:
+    """
+    SQLite online backup API ile çalışan, uygulamayı durdurmayan yedekleme.
+    Kopyalama küçük sayfa gruplarıyla yapılır ve her adımdan sonra kilit
+    bırakılır; böylece Veritabani yazıcıları en fazla birkaç ms bekler.
+    """
+
+    def __init__(self, db, yedek_dizini=YEDEK_DIR, saklama_sayisi=YEDEK_SAKLAMA_SAYISI):
+        self.db = db
+        self.db_yolu = db.db_yolu
+        self.yedek_dizini = yedek_dizini
+        self.saklama_sayisi = saklama_sayisi
+        self.son_yedek = None
+        self.son_sonuc = None
+        self._kilit = threading.Lock()      # Aynı anda tek yedekleme/geri yükleme
+        self._durdur = threading.Event()
+        self._zamanlayici = None
+
+    def _dosya_oneki(self):
+        return os.path.splitext(os.path.basename(self.db_yolu))[0] + "_"
+
+    @staticmethod
+    def _adim_arasi_bekle(durum, kalan, toplam):
+        # backup() yalnızca BUSY durumunda bekler; adımlar arasında yazıcılara yer açmak için burada uyunur.
+        time.sleep(YEDEK_ADIM_BEKLEME)
+
+    @classmethod
+    def _yeniden_baslama_sinirli(cls, sinir=YEDEK_YENIDEN_BASLAMA_SINIRI):
+        """
+        WAL yokken anlık görüntü sabitlenemez; başka bir bağlantı yazdığında SQLite kopyayı
+        baştan başlatır (kalan sayfa sayısı artar). Sürekli yazma altında sonsuz döngüye
+        girmemek için yeniden başlamalar sayılır ve sınır aşılınca yedekleme iptal edilir.
+        """
+        durum = {"onceki": None, "yeniden": 0}
+        def ilerleme(adim_durumu, kalan, toplam):
+            if durum["onceki"] is not None and kalan > durum["onceki"]:
+                durum["yeniden"] += 1
+                if durum["yeniden"] > sinir:
+                    raise sqlite3.OperationalError(
+                        f"Veritabanı sürekli değiştiği için yedek {sinir} denemede tamamlanamadı; daha sakin bir anda tekrar deneyin.")
+            durum["onceki"] = kalan
+            cls._adim_arasi_bekle(adim_durumu, kalan, toplam)
+        return ilerleme
+
+    def yedek_al(self):
+        """Canlı veritabanının sıkıştırılmış bir kopyasını alır, eski yedekleri döndürür."""
+        if not self._kilit.acquire(blocking=False):
+            return "Uyarı: Devam eden bir yedekleme işlemi var."
+        gecici = None
+        try:
+            os.makedirs(self.yedek_dizini, exist_ok=True)
+            zaman = datetime.now().strftime("%Y%m%d_%H%M%S")
+            hedef = os.path.join(self.yedek_dizini, f"{self._dosya_oneki()}{zaman}.db.gz")
+            gecici = hedef[:-3] + ".tmp"
+
+            kaynak = sqlite3.connect(self.db_yolu)
+            kopya = sqlite3.connect(gecici)
+            try:
+                if kaynak.execute("PRAGMA journal_mode").fetchone()[0] == 'wal':
+                    # Okuma transaction'ı açık tutularak tutarlı bir anlık görüntü sabitlenir.
+                    # Aksi halde araya giren her yazma işlemi yedeklemeyi baştan başlatır.
+                    kaynak.execute("BEGIN")
+                    kaynak.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+                    kaynak.backup(kopya, pages=YEDEK_ADIM_SAYFA, progress=self._adim_arasi_bekle)
+                    kaynak.rollback()
+                else:
+                    # WAL yokken açık bir okuma yazıcıları bloklar; kilit yalnızca her küçük adım
+                    # süresince tutulur, araya giren yazmalar kopyayı yeniden başlatır.
+                    kaynak.backup(kopya, pages=YEDEK_ADIM_SAYFA, progress=self._yeniden_baslama_sinirli())
+            finally:
+                kopya.close()
+                kaynak.close()
+
+            # Sıkıştırma canlı veritabanına dokunmaz, yalnızca geçici kopya üzerinde çalışır.
+            with open(gecici, 'rb') as f_in, gzip.open(hedef, 'wb') as f_out:
+                shutil.copyfileobj(f_in, f_out)
+            self.son_yedek = hedef
+            self._eski_yedekleri_temizle()
+            return True
+        except Exception as e:
+            return f"Yedekleme hatası: {e}"
+        finally:
+            if gecici and os.path.exists(gecici):
+                os.remove(gecici)
+            self._kilit.release()
+
+    def yedekleri_listele(self):
+        """Mevcut yedekleri en yeniden eskiye doğru döndürür."""
+        if not os.path.isdir(self.yedek_dizini):
+            return []
+        onek = self._dosya_oneki()
+        dosyalar = [f for f in os.listdir(self.yedek_dizini) if f.startswith(onek) and f.endswith(".db.gz")]
+        return [os.path.join(self.yedek_dizini, f) for f in sorted(dosyalar, reverse=True)]
+
+    def _eski_yedekleri_temizle(self):
+        for yol in self.yedekleri_listele()[self.saklama_sayisi:]:
+            try:
+                os.remove(yol)
+            except OSError: pass
+
+    def yedekten_geri_yukle(self, yedek_yolu):
+        """
+        Yedeği önce geçici dosyaya açar ve bütünlüğünü kontrol eder.
+        Kontrolden geçen yedek, backup API ile canlı veritabanına yazılır.
+        """
+        if not self._kilit.acquire(blocking=False):
+            return "Uyarı: Devam eden bir yedekleme işlemi var."
+        gecici = os.path.join(self.yedek_dizini, "geri_yukleme.tmp")
+        try:
+            os.makedirs(self.yedek_dizini, exist_ok=True)
+            acici = gzip.open if yedek_yolu.endswith(".gz") else open
+            with acici(yedek_yolu, 'rb') as f_in, open(gecici, 'wb') as f_out:
+                shutil.copyfileobj(f_in, f_out)
+
+            kaynak = sqlite3.connect(gecici)
+            try:
+                sonuc = kaynak.execute("PRAGMA integrity_check").fetchall()
+                if sonuc != [("ok",)]:
+                    hatalar = "\n".join(str(r[0]) for r in sonuc[:5])
+                    return f"Bütünlük kontrolü başarısız, geri yükleme iptal edildi:\n{hatalar}"
+                hedef = sqlite3.connect(self.db_yolu, timeout=10)
+                try:
+                    kaynak.backup(hedef)
+                finally:
+                    hedef.close()
+            finally:
+                kaynak.close()
+            # Eski bir yedekte sonraki sürümlerin tablo, sütun ve tetikleyicileri olmayabilir.
+            self.db._tablo_olustur()
+            return True
+        except Exception as e:
+            return f"Geri yükleme hatası: {e}"
+        finally:
+            if os.path.exists(gecici):
+                os.remove(gecici)
+            self._kilit.release()
+
+    def arka_planda_yedek_al(self):
+        """Yedeği ayrı bir thread'de alır; sonuç 'son_sonuc' alanına yazılır."""
+        def calis():
+            self.son_sonuc = self.yedek_al()
+        t = threading.Thread(target=calis, name="yedek-al", daemon=True)
+        t.start()
+        return t
+
+    def zamanlanmis_baslat(self, aralik_sn=YEDEK_ARALIGI_SN):
+        if self._zamanlayici and self._zamanlayici.is_alive():
+            return
+        self._durdur.clear()
+        def dongu():
+            while not self._durdur.wait(aralik_sn):
+                self.son_sonuc = self.yedek_al()
+        self._zamanlayici = threading.Thread(target=dongu, name="yedek-zamanlayici", daemon=True)
+        self._zamanlayici.start()
+
+    def durdur(self):
+        self._durdur.set()
+
+
+# ==========================================
+# 1.3 SİPARİŞ KUYRUĞU (Group Commit)
+# ==========================================
+
+class SiparisKuyrugu:
+    """
+    Siparişleri kalıcı 'siparis_kuyrugu' tablosuna yazıp hemen dönen,
+    arka planda ise bekleyenleri öncelik/FIFO sırasıyla gruplar halinde
+    işleyen yapı. Her grup tek transaction ve tek commit ile yazılır;
+    stok kontrolleri sırayla uygulandığından önce gelen sipariş kazanır.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        # Ekleme bağlantısı WAL + synchronous=NORMAL ile çalışır: commit fsync beklemez,
+        # uygulama çökse bile kayıt kaybolmaz (yalnızca elektrik kesintisinde son kayıtlar riskli).
+        # WAL kapalıyken NORMAL güvenli olmadığından varsayılan (FULL) korunur.
+        self._ekle_conn = sqlite3.connect(db.db_yolu, timeout=10, check_same_thread=False)
+        if db.wal_modu:
+            self._ekle_conn.execute("PRAGMA synchronous = NORMAL")
+        self._ekle_kilit = threading.Lock()
+        self._uyandir = threading.Event()
+        self._durdur = threading.Event()
+        self._isci = None
+        self.islenen_sayisi = 0     # Arayüz bu sayaç değiştiğinde ekranı yeniler
+        self.son_hata = None        # İşçideki beklenmeyen son hata; arayüz gösterip temizler
+
+    def ekle(self, urun_ad, miktar, oncelik=0):
+        """Siparişi kuyruğa yazar. Başarılıysa kuyruk numarasını, değilse hata mesajını döndürür."""
+        try:
+            with self._ekle_kilit:
+                cursor = self._ekle_conn.execute(
+                    "INSERT INTO siparis_kuyrugu (urun_ad, miktar, oncelik) VALUES (?, ?, ?)",
+                    (urun_ad, miktar, oncelik))
+                self._ekle_conn.commit()
+            self._uyandir.set()
+            return cursor.lastrowid
+        except sqlite3.Error as e:
+            return f"Kuyruk hatası: {e}"
+
+    def _baglanti_ac(self):
+        conn = sqlite3.connect(self.db.db_yolu, timeout=10)
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    def _grup_isle(self, grup_boyutu=KUYRUK_GRUP_BOYUTU, conn=None):
+        """
+        Bekleyen siparişlerden bir grubu tek transaction içinde işler, işlenen sayısını döndürür.
+        Bağlantı verilmezse (ör. başka bir thread'den çağrıldığında) geçici bir bağlantı açılır.
+        """
+        if conn is None:
+            conn = self._baglanti_ac()
+            try:
+                return self._grup_isle(grup_boyutu, conn)
+            finally:
+                conn.close()
+        try:
+            # Kuyruk boşken yazma kilidi alınmaz; kontrol indeksli, salt okunur bir sorgudur.
+            if conn.execute("SELECT 1 FROM siparis_kuyrugu WHERE durum = 'BEKLİYOR' LIMIT 1").fetchone() is None:
+                return 0
+            conn.execute("BEGIN IMMEDIATE")
+            bekleyenler = conn.execute("""
+                SELECT id, urun_ad, miktar FROM siparis_kuyrugu
+                WHERE durum = 'BEKLİYOR'
+                ORDER BY oncelik DESC, id ASC
+                LIMIT ?
+            """, (grup_boyutu,)).fetchall()
+            if not bekleyenler:
+                conn.rollback()
+                return 0
+
+            # Grubun ihtiyaç duyduğu reçete ve stoklar tek seferde belleğe alınır.
+            urunler = list({urun for _, urun, _ in bekleyenler})
+            tarifler = {}
+            for urun, mid, adet in conn.execute(
+                    f"SELECT urun_ad, malzeme_id, kullanilan_adet FROM tarifler WHERE urun_ad IN ({','.join('?' * len(urunler))})",
+                    urunler):
+                tarifler.setdefault(urun, []).append((mid, adet))
+            malzeme_idleri = list({mid for bilesenler in tarifler.values() for mid, _ in bilesenler})
+            stok = {}
+            if malzeme_idleri:
+                for mid, ad, miktar in conn.execute(
+                        f"SELECT id, ad, miktar FROM malzemeler WHERE id IN ({','.join('?' * len(malzeme_idleri))})",
+                        malzeme_idleri):
+                    stok[mid] = [ad, miktar]
+
+            sonuclar, gecmis, degisen = [], [], set()
+            for kuyruk_id, urun, siparis_miktari in bekleyenler:
+                # Stok sözlüğü grup içinde güncellendiği için her sipariş öncekilerden kalanı görür.
+                sonuc = Veritabani._siparis_hesapla(urun, siparis_miktari, tarifler.get(urun), stok)
+                if isinstance(sonuc, str):
+                    sonuclar.append(("HATA", sonuc, kuyruk_id))
+                    continue
+                dusumler, aciklama = sonuc
+                for mid, dusulecek in dusumler:
+                    stok[mid][1] -= dusulecek
+                    degisen.add(mid)
+                gecmis.append(("SİPARİŞ", aciklama, 0))
+                sonuclar.append(("TAMAMLANDI", None, kuyruk_id))
+
+            conn.executemany("UPDATE malzemeler SET miktar = ? WHERE id = ?", [(stok[mid][1], mid) for mid in degisen])
+            conn.executemany("INSERT INTO islem_gecmisi (islem_tipi, aciklama, miktar_degisim) VALUES (?, ?, ?)", gecmis)
+            conn.executemany("""
+                UPDATE siparis_kuyrugu SET durum = ?, sonuc = ?, islenme = datetime('now', 'localtime')
+                WHERE id = ?
+            """, sonuclar)
+            conn.commit()
+            return len(bekleyenler)
+        except Exception:
+            conn.rollback()
+            raise
+
+    def bekleyenleri_isle(self):
+        """Kuyruk boşalana kadar bu thread'de işler (toplu içe aktarma ve testler için)."""
+        toplam = 0
+        while True:
+            islenen = self._grup_isle()
+            if not islenen:
+                return toplam
+            toplam += islenen
+            self.islenen_sayisi += islenen
+
+    def _hatali_siparisi_ayikla(self, conn):
+        """
+        Beklenmeyen bir hata grubu durdurduysa sıradaki sipariş tek başına denenir;
+        yine hata verirse HATA olarak işaretlenir ki kuyruk tıkanmasın.
+        """
+        try:
+            return self._grup_isle(1, conn)
+        except sqlite3.Error:
+            return 0
+        except Exception as e:
+            log.exception("Sipariş işlenemedi, HATA olarak işaretleniyor")
+            try:
+                conn.execute("""
+                    UPDATE siparis_kuyrugu SET durum = 'HATA', sonuc = ?, islenme = datetime('now', 'localtime')
+                    WHERE id = (SELECT id FROM siparis_kuyrugu WHERE durum = 'BEKLİYOR' ORDER BY oncelik DESC, id ASC LIMIT 1)
+                """, (f"İşlem sırasında hata: {e}",))
+                conn.commit()
+                return 1
+            except sqlite3.Error:
+                return 0
+
+    def _dongu(self):
+        # İşçinin bağlantısı kendi thread'inde bir kez açılır ve işçi durana kadar kullanılır.
+        conn = self._baglanti_ac()
+        bekleme = KUYRUK_BEKLEME_SN
+        try:
+            while not self._durdur.is_set():
+                self._uyandir.clear()
+                try:
+                    islenen = self._grup_isle(conn=conn)
+                except sqlite3.Error:
+                    islenen = 0     # Veritabanı kilitli vb.; bir sonraki turda tekrar denenir
+                except Exception as e:
+                    # İşçi thread'i ölürse siparişler sonsuza dek BEKLİYOR kalır; hata kaydedilip devam edilir.
+                    log.exception("Sipariş kuyruğu grubu işlenemedi")
+                    self.son_hata = f"Kuyruk hatası: {e}"
+                    islenen = None
+                if islenen is None:
+                    islenen = self._hatali_siparisi_ayikla(conn)
+                if islenen:
+                    self.islenen_sayisi += islenen
+                    bekleme = KUYRUK_BEKLEME_SN
+                    continue
+                # Bu süreçteki eklemeler işçiyi hemen uyandırır; artan bekleme yalnızca başka
+                # istemcilerin (aynı veritabanını kullanan diğer pencerelerin) eklediği siparişleri geciktirir.
+                if self._uyandir.wait(bekleme):
+                    bekleme = KUYRUK_BEKLEME_SN
+                else:
+                    bekleme = min(bekleme * 2, KUYRUK_EN_UZUN_BEKLEME_SN)
+        finally:
+            conn.close()
+
+    def baslat(self):
+        if self._isci and self._isci.is_alive():
+            return
+        self._durdur.clear()
+        self._isci = threading.Thread(target=self._dongu, name="siparis-kuyrugu", daemon=True)
+        self._isci.start()
+
+    def durdur(self):
+        self._durdur.set()
+        self._uyandir.set()
+
+
+# ==========================================
+# 1.4 KOLONSAL ANLIK GÖRÜNTÜ (Analiz)
+# ==========================================
+
+_KARSILASTIRMALAR = {'<': operator.lt, '<=': operator.le, '>': operator.gt,
+                     '>=': operator.ge, '==': operator.eq, '!=': operator.ne}
+_NUMPY_TIPLERI = {'q': 'int64', 'i': 'int32', 'd': 'float64'}
+
+
+class AdTablosu:
+    """
+    Tekrarlanan metinleri (malzeme adı, işlem tipi) bir kez saklayan tablo.
+    UTF-8 blob + ofset dizisi olarak tutulur; ad yalnızca istendiğinde çözülür.
+    """
+
+    def __init__(self, blob, ofsetler):
+        self._blob = blob
+        self._ofsetler = ofsetler
+        self._indeks = None
+
+    @classmethod
+    def olustur(cls, adlar):
+        blob, ofsetler = bytearray(), array('q', [0])
+        for ad in adlar:
+            blob += ad.encode('utf-8')
+            ofsetler.append(len(blob))
+        return cls(memoryview(bytes(blob)), memoryview(ofsetler))
+
+    def __len__(self):
+        return len(self._ofsetler) - 1
+
+    def __getitem__(self, i):
+        return bytes(self._blob[self._ofsetler[i]:self._ofsetler[i + 1]]).decode('utf-8')
+
+    def indeks(self, ad):
+        """Adın sıra numarasını döndürür, yoksa -1."""
+        if self._indeks is None:
+            self._indeks = {self[i]: i for i in range(len(self))}
+        return self._indeks.get(ad, -1)
+
+
+class KolonsalTablo:
+    """
+    Bir tablonun sütunlarını tip kodlu memoryview'lar olarak tutar ('q', 'i', 'd').
+    Sütunlar array veya mmap üzerindedir; dilimleme kopyasızdır. NumPy kuruluysa
+    filtre ve toplamlar NumPy ile, değilse C seviyesinde çalışan map/compress ile yapılır.
+    """
+
+    def __init__(self, kolonlar, adlar):
+        self.kolonlar = kolonlar
+        self.adlar = adlar
+
+    def __len__(self):
+        return len(next(iter(self.kolonlar.values()))) if self.kolonlar else 0
+
+    def kolon(self, ad):
+        return self.kolonlar[ad]
+
+    def dizi(self, ad):
+        """NumPy kuruluysa sütunun kopyasız ndarray görünümü, değilse memoryview."""
+        mv = self.kolonlar[ad]
+        if np is None:
+            return mv
+        return np.frombuffer(mv, dtype=_NUMPY_TIPLERI[mv.format])
+
+    def dilim(self, bas, son):
+        return KolonsalTablo({ad: mv[bas:son] for ad, mv in self.kolonlar.items()}, self.adlar)
+
+    def karsilastir(self, kolon, islec, deger):
+        """'miktar <= kritik_esik' gibi bir koşulun maskesini üretir. deger sayı ya da sütun adı olabilir."""
+        op = _KARSILASTIRMALAR[islec]
+        if np is not None:
+            return op(self.dizi(kolon), self.dizi(deger) if isinstance(deger, str) else deger)
+        diger = self.kolonlar[deger] if isinstance(deger, str) else repeat(deger)
+        return bytes(map(op, self.kolonlar[kolon], diger))
+
+    @staticmethod
+    def ve(maske1, maske2):
+        if np is not None:
+            return maske1 & maske2
+        return bytes(map(operator.and_, maske1, maske2))
+
+    @staticmethod
+    def say(maske):
+        return int(maske.sum()) if np is not None else sum(maske)
+
+    def filtrele(self, maske):
+        kolonlar = {}
+        for ad, mv in self.kolonlar.items():
+            a = array(mv.format)
+            if np is not None:
+                a.frombytes(self.dizi(ad)[maske].tobytes())
+            else:
+                a.extend(compress(mv, maske))
+            kolonlar[ad] = memoryview(a)
+        return KolonsalTablo(kolonlar, self.adlar)
+
+    def topla(self, kolon, maske=None):
+        if np is not None:
+            d = self.dizi(kolon)
+            return (d if maske is None else d[maske]).sum().item()
+        mv = self.kolonlar[kolon]
+        return sum(mv) if maske is None else sum(compress(mv, maske))
+
+    def grupla_topla(self, anahtar, deger, maske=None):
+        """Ad tablosu indeksiyle gruplanmış toplamlar: {ad: toplam}. -1 anahtarlı satırlar atlanır."""
+        if np is not None:
+            k, v = self.dizi(anahtar), self.dizi(deger)
+            secim = k >= 0 if maske is None else (k >= 0) & maske
+            sayilar = np.bincount(k[secim])
+            toplamlar = np.bincount(k[secim], weights=v[secim])
+            return {self.adlar[i]: toplamlar[i].item() for i in np.flatnonzero(sayilar)}
+        toplamlar = {}
+        satirlar = zip(self.kolonlar[anahtar], self.kolonlar[deger])
+        if maske is not None:
+            satirlar = compress(satirlar, maske)
+        for k, v in satirlar:
+            if k >= 0:
+                toplamlar[k] = toplamlar.get(k, 0) + v
+        return {self.adlar[k]: t for k, t in toplamlar.items()}
+
+
+class EnvanterGoruntusu:
+    """
+    'malzemeler' ve 'islem_gecmisi' tablolarının kolonsal anlık görüntüsü.
+
+    malzemeler   : id(q), ad(i), miktar(d), kritik_esik(d)
+    gecmis       : id(q), tarih(q, yerel saat Unix saniyesi), islem_tipi(i), hedef(i), miktar_degisim(d)
+
+    'ad', 'islem_tipi' ve 'hedef' (açıklamada tırnak içindeki malzeme/ürün adı) ortak ad tablosunun
+    indeksleridir. Görüntü diske mmap ile açılabilen tek dosya olarak önbelleğe alınır; veritabanı
+    değişmediyse (değişiklik imleci aynıysa) sonraki yüklemeler SQLite'ı hiç okumaz.
+    kritik_esik INTEGER tanımlı olsa da SQLite ondalıklı değer saklayabildiğinden 'd' tutulur.
+    """
+
+    SURUM = 2
+    PARCA = 10000       # SQLite'tan her seferde okunan satır sayısı
+
+    def __init__(self, malzemeler, gecmis, adlar, imza):
+        self.malzemeler = malzemeler
+        self.gecmis = gecmis
+        self.adlar = adlar
+        self.imza = imza
+        self._mmap = None
+
+    # --- YÜKLEME ---
+
+    @staticmethod
+    def _imza_al(conn):
+        # Değişiklik imleci + en büyük ID'ler; geri yüklenen bir yedek de farklı imza üretir.
+        return list(conn.execute("""
+            SELECT (SELECT COALESCE(MAX(seq), 0) FROM degisiklik_gunlugu),
+                   (SELECT COALESCE(MAX(id), 0) FROM malzemeler),
+                   (SELECT COALESCE(MAX(id), 0) FROM islem_gecmisi)
+        """).fetchone())
+
+    @staticmethod
+    def _onbellek_dosyasi(db_yolu, onbellek_dizini):
+        # Farklı klasörlerdeki aynı adlı veritabanları (ör. atölyeler) ayrı dosyalara yazılır.
+        tam_yol = os.path.normcase(os.path.abspath(db_yolu))
+        ozet = hashlib.sha1(tam_yol.encode('utf-8')).hexdigest()[:12]
+        return os.path.join(onbellek_dizini, f"{os.path.splitext(os.path.basename(db_yolu))[0]}_{ozet}.kolon"), tam_yol
+
+    @classmethod
+    def yukle(cls, db_yolu, onbellek_dizini=ONBELLEK_DIR):
+        dosya = tam_yol = None
+        if onbellek_dizini:
+            dosya, tam_yol = cls._onbellek_dosyasi(db_yolu, onbellek_dizini)
+        conn = sqlite3.connect(db_yolu)
+        try:
+            imza = cls._imza_al(conn)
+            if dosya and os.path.exists(dosya):
+                try:
+                    goruntu, kaynak = cls._dosyadan_ac(dosya)
+                    if goruntu.imza == imza and kaynak == tam_yol:
+                        return goruntu
+                except (OSError, ValueError, KeyError):
+                    pass    # Bozuk/eski önbellek yeniden oluşturulur
+            goruntu = cls._sqliteden_oku(conn, imza)
+        finally:
+            conn.close()
+        if dosya:
+            try:
+                goruntu._dosyaya_yaz(dosya, tam_yol)
+            except OSError:
+                pass        # Önbellek yazılamazsa görüntü yine de kullanılabilir
+        return goruntu
+
+    @classmethod
+    def _sqliteden_oku(cls, conn, imza):
+        adlar, ad_indeksi = [], {}
+        def intern(ad):
+            if ad is None:
+                return -1
+            i = ad_indeksi.get(ad)
+            if i is None:
+                i = ad_indeksi[ad] = len(adlar)
+                adlar.append(ad)
+            return i
+
+        m = {'id': array('q'), 'ad': array('i'), 'miktar': array('d'), 'kritik_esik': array('d')}
+        cursor = conn.execute("SELECT id, ad, miktar, kritik_esik FROM malzemeler ORDER BY id")
+        while True:
+            parca = cursor.fetchmany(cls.PARCA)
+            if not parca: break
+            idler, isimler, miktarlar, esikler = zip(*parca)
+            m['id'].extend(idler)
+            m['ad'].extend(map(intern, isimler))
+            m['miktar'].extend(miktarlar)
+            m['kritik_esik'].extend(esikler)
+
+        g = {'id': array('q'), 'tarih': array('q'), 'islem_tipi': array('i'), 'hedef': array('i'), 'miktar_degisim': array('d')}
+        # Tarih ve hedef adı SQLite içinde (C tarafında) ayrıştırılır.
+        cursor = conn.execute("""
+            SELECT id,
+                   COALESCE(CAST(strftime('%s', tarih) AS INTEGER), 0),
+                   islem_tipi,
+                   CASE WHEN substr(aciklama, 1, 1) = '''' AND instr(substr(aciklama, 2), '''') > 1
+                        THEN substr(aciklama, 2, instr(substr(aciklama, 2), '''') - 1) END,
+                   COALESCE(miktar_degisim, 0)
+            FROM islem_gecmisi ORDER BY id
+        """)
+        while True:
+            parca = cursor.fetchmany(cls.PARCA)
+            if not parca: break
+            idler, tarihler, tipler, hedefler, degisimler = zip(*parca)
+            g['id'].extend(idler)
+            g['tarih'].extend(tarihler)
+            g['islem_tipi'].extend(map(intern, tipler))
+            g['hedef'].extend(map(intern, hedefler))
+            g['miktar_degisim'].extend(degisimler)
+
+        ad_tablosu = AdTablosu.olustur(adlar)
+        return cls(KolonsalTablo({k: memoryview(v) for k, v in m.items()}, ad_tablosu),
+                   KolonsalTablo({k: memoryview(v) for k, v in g.items()}, ad_tablosu),
+                   ad_tablosu, imza)
+
+    @classmethod
+    def birlestir(cls, goruntuler, id_ofsetleri):
+        """
+        Atölye görüntülerini tek görüntüde birleştirir (federasyon). ID'lere atölyenin ofseti
+        eklenir (global ID), ad indeksleri ortak ad tablosuna çevrilir; diğer sütunlar kopyalanır.
+        """
+        adlar, ad_indeksi = [], {}
+        m = {'id': array('q'), 'ad': array('i'), 'miktar': array('d'), 'kritik_esik': array('d')}
+        g = {'id': array('q'), 'tarih': array('q'), 'islem_tipi': array('i'), 'hedef': array('i'), 'miktar_degisim': array('d')}
+        for goruntu, ofset in zip(goruntuler, id_ofsetleri):
+            ceviri = []
+            for i in range(len(goruntu.adlar)):
+                ad = goruntu.adlar[i]
+                if ad not in ad_indeksi:
+                    ad_indeksi[ad] = len(adlar)
+                    adlar.append(ad)
+                ceviri.append(ad_indeksi[ad])
+            ceviri.append(-1)     # -1 (ad yok) indeksi listenin son elemanına, yani yine -1'e düşer
+            for hedef, kaynak in ((m, goruntu.malzemeler), (g, goruntu.gecmis)):
+                for ad, dizi in hedef.items():
+                    mv = kaynak.kolon(ad)
+                    if ad == 'id':
+                        dizi.extend(map(ofset.__add__, mv))
+                    elif dizi.typecode == 'i':
+                        dizi.extend(map(ceviri.__getitem__, mv))
+                    else:
+                        dizi.frombytes(mv.cast('B'))
+        ad_tablosu = AdTablosu.olustur(adlar)
+        return cls(KolonsalTablo({k: memoryview(v) for k, v in m.items()}, ad_tablosu),
+                   KolonsalTablo({k: memoryview(v) for k, v in g.items()}, ad_tablosu),
+                   ad_tablosu, [goruntu.imza for goruntu in goruntuler])
+
+    # --- DİSK ÖNBELLEĞİ ---
+    # Dosya: 8 bayt başlık uzunluğu + JSON başlık + 8 bayta hizalanmış ham sütun baytları.
+
+    def _dosyaya_yaz(self, dosya, kaynak):
+        os.makedirs(os.path.dirname(dosya), exist_ok=True)
+        parcalar = [("adlar", "blob", self.adlar._blob), ("adlar", "ofsetler", self.adlar._ofsetler)]
+        for tablo_ad, tablo in (("malzemeler", self.malzemeler), ("gecmis", self.gecmis)):
+            parcalar.extend((tablo_ad, ad, mv) for ad, mv in tablo.kolonlar.items())
+
+        yerlesim, ofset = [], 0
+        for tablo_ad, ad, mv in parcalar:
+            yerlesim.append([tablo_ad, ad, mv.format, ofset, mv.nbytes])
+            ofset += (mv.nbytes + 7) // 8 * 8
+        baslik = json.dumps({"surum": self.SURUM, "bayt_sirasi": sys.byteorder, "kaynak": kaynak,
+                             "imza": self.imza, "parcalar": yerlesim}).encode('utf-8')
+        baslik += b" " * (-(8 + len(baslik)) % 8)
+
+        gecici = dosya + ".tmp"
+        with open(gecici, 'wb') as f:
+            f.write(len(baslik).to_bytes(8, 'little'))
+            f.write(baslik)
+            for _, _, mv in parcalar:
+                f.write(mv.cast('B'))
+                f.write(b"\0" * (-mv.nbytes % 8))
+        os.replace(gecici, dosya)
+
+    @classmethod
+    def _dosyadan_ac(cls, dosya):
+        with open(dosya, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        veri = memoryview(mm)
+        baslik_uzunlugu = int.from_bytes(veri[:8], 'little')
+        baslik = json.loads(bytes(veri[8:8 + baslik_uzunlugu]))
+        if baslik["surum"] != cls.SURUM or baslik["bayt_sirasi"] != sys.byteorder:
+            raise ValueError("Önbellek biçimi uyumsuz.")
+        taban = 8 + baslik_uzunlugu
+        kolonlar = {"adlar": {}, "malzemeler": {}, "gecmis": {}}
+        for tablo_ad, ad, tip, ofset, bayt in baslik["parcalar"]:
+            kolonlar[tablo_ad][ad] = veri[taban + ofset:taban + ofset + bayt].cast(tip)
+        ad_tablosu = AdTablosu(kolonlar["adlar"]["blob"], kolonlar["adlar"]["ofsetler"])
+        goruntu = cls(KolonsalTablo(kolonlar["malzemeler"], ad_tablosu),
+                      KolonsalTablo(kolonlar["gecmis"], ad_tablosu),
+                      ad_tablosu, baslik["imza"])
+        goruntu._mmap = mm
+        return goruntu, baslik["kaynak"]
+
+    # --- HAZIR ANALİZLER ---
+
+    def kritik_maske(self):
+        return self.malzemeler.karsilastir('miktar', '<=', 'kritik_esik')
+
+    def esik_oranlari(self):
+        """Her malzeme için miktar / kritik_esik (eşik 0 ise inf)."""
+        if np is not None:
+            # 0/0 NumPy'de nan verir; yedek yol ile aynı sonuç için eşiği 0 olanlar açıkça inf yapılır.
+            miktar, esik = self.malzemeler.dizi('miktar'), self.malzemeler.dizi('kritik_esik')
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return np.where(esik == 0, np.inf, miktar / esik)
+        miktar, esik = self.malzemeler.kolon('miktar'), self.malzemeler.kolon('kritik_esik')
+        return array('d', map(lambda m, e: m / e if e else float('inf'), miktar, esik))
+
+    def toplam_stok(self):
+        return self.malzemeler.topla('miktar')
+
+    def islem_tipine_gore(self):
+        """İşlem tipi başına toplam miktar değişimi."""
+        return self.gecmis.grupla_topla('islem_tipi', 'miktar_degisim')
+
+    def malzemeye_gore_degisim(self, baslangic=None):
+        """Malzeme/ürün başına toplam değişim; baslangic (Unix saniyesi) verilirse o tarihten sonrası."""
+        maske = None if baslangic is None else self.gecmis.karsilastir('tarih', '>=', baslangic)
+        return self.gecmis.grupla_topla('hedef', 'miktar_degisim', maske)
+
+
+# ==========================================
+# 1.5 MALİYET HESAPLAMA
+# ==========================================
+
+class MaliyetMotoru:
+    """
+    Reçetelerden ürün başına malzeme maliyetini hesaplar ve önbellekte tutar.
+    malzeme -> ürün ters indeksi sayesinde bir birim fiyat değiştiğinde yalnızca o
+    malzemeyi kullanan ürünlerin maliyeti geçersiz sayılır. Değişiklikler değişiklik
+    günlüğünden okunduğu için başka istemcilerin fiyat düzenlemeleri de yakalanır.
+
+    Günlük imlecini yalnızca senkronize() ilerletir; geçersiz kalan ürünler bekleyen kümesinde
+    birikir ve maliyet panosu onları gecersizleri_al() ile tüketir. Böylece maliyeti başka bir
+    yerden (ör. reçete başlığı) okumak panonun güncellemelerini kaybettirmez.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._tarifler = {}     # urun -> {malzeme_id: kullanilan_adet}
+        self._ters = {}         # malzeme_id -> {urun, ...}
+        self._fiyatlar = {}     # malzeme_id -> birim_maliyet
+        self._onbellek = {}     # urun -> maliyet
+        self._bekleyen = set()  # pano henüz yenilemediği, maliyeti değişmiş olabilecek ürünler
+        self._imlec = None
+
+    def sifirla(self):
+        """Önbelleği bırakır; ilk kullanımda her şey yeniden yüklenir (ör. yedek geri yüklendiğinde)."""
+        self._imlec = None
+
+    def yukle(self):
+        self._imlec = self.db.degisiklik_imleci()
+        self._fiyatlar = dict(self.db.birim_maliyetleri_oku())
+        self._tarifler, self._ters, self._onbellek, self._bekleyen = {}, {}, {}, set()
+        for urun, mid, adet in self.db.tarif_satirlarini_oku():
+            self._tarife_ekle(urun, mid, adet)
+
+    def _tarife_ekle(self, urun, mid, adet):
+        self._tarifler.setdefault(urun, {})[mid] = adet
+        self._ters.setdefault(mid, set()).add(urun)
+
+    def _tarifi_cikar(self, urun):
+        for mid in self._tarifler.pop(urun, {}):
+            kullananlar = self._ters.get(mid)
+            if kullananlar is not None:
+                kullananlar.discard(urun)
+                if not kullananlar:
+                    del self._ters[mid]
+
+    def senkronize(self):
+        """Son senkrondan beri olan değişiklikleri uygular; maliyeti değişebilecek ürünler bekleyenlere eklenir."""
+        sonuc = None if self._imlec is None else self.db.degisiklikleri_cek(self._imlec)
+        if sonuc is None:
+            # İlk yükleme, sıfırlama veya budanmış/geri yüklenmiş günlük: tam yükleme. Eski ürünler de
+            # bekleyenlere eklenir ki artık var olmayanlar panodan silinsin.
+            eski = set(self._tarifler) | self._bekleyen
+            self.yukle()
+            self._bekleyen = eski | set(self._tarifler)
+            return
+        self._imlec, degisiklikler = sonuc
+
+        malzemeler, urunler = set(), set()
+        for tablo, islem, kayit_id, urun_ad in degisiklikler:
+            if tablo == 'malzemeler':
+                malzemeler.add(kayit_id)
+            elif tablo == 'tarifler':
+                urunler.add(urun_ad)
+
+        gecersiz = set()
+        if malzemeler:
+            # Stok hareketleri de 'malzemeler' güncellemesi üretir; yalnızca fiyatı gerçekten değişenler geçersiz kılar.
+            yeni_fiyatlar = dict(self.db.birim_maliyetleri_oku(malzemeler))
+            for mid in malzemeler:
+                fiyat = yeni_fiyatlar.get(mid)
+                if fiyat == self._fiyatlar.get(mid):
+                    continue
+                if fiyat is None:
+                    self._fiyatlar.pop(mid, None)
+                else:
+                    self._fiyatlar[mid] = fiyat
+                gecersiz |= self._ters.get(mid, set())
+        if urunler:
+            for urun in urunler:
+                self._tarifi_cikar(urun)
+            for urun, mid, adet in self.db.tarif_satirlarini_oku(urunler):
+                self._tarife_ekle(urun, mid, adet)
+            gecersiz |= urunler
+        for urun in gecersiz:
+            self._onbellek.pop(urun, None)
+        self._bekleyen |= gecersiz
+
+    def _hesapla(self, urun):
+        maliyet = self._onbellek.get(urun)
+        if maliyet is None and urun in self._tarifler:
+            maliyet = sum(adet * self._fiyatlar.get(mid, 0) for mid, adet in self._tarifler[urun].items())
+            self._onbellek[urun] = maliyet
+        return maliyet
+
+    def urun_maliyeti(self, urun):
+        """Ürünün bir biriminin malzeme maliyeti; reçetesi yoksa None."""
+        self.senkronize()
+        return self._hesapla(urun)
+
+    def bilesen_sayisi(self, urun):
+        return len(self._tarifler.get(urun, ()))
+
+    def gecersizleri_al(self):
+        """
+        Son çağrıdan beri maliyeti değişmiş olabilecek ürünler: {urun: maliyet}.
+        Reçetesi silinen ürünün maliyeti None'dır. Günlük yalnızca bir kez okunur.
+        """
+        self.senkronize()
+        bekleyen, self._bekleyen = self._bekleyen, set()
+        return {urun: self._hesapla(urun) for urun in bekleyen}
+
+    def tum_maliyetler(self):
+        """Panonun tam dolumu için tüm ürünler; bekleyen geçersizlemeler de karşılanmış sayılır."""
+        self.senkronize()
+        self._bekleyen = set()
+        return {urun: self._hesapla(urun) for urun in self._tarifler}
+
+
 # ==========================================
 # 2. ARAYÜZ KATMANI
 # ==========================================
 
 class MalzemeTakipUygulamasi:
-    def __init__(self, master):
+    def __init__(self, master, hizli_acilis=HIZLI_ACILIS):
         self.master = master
+        self._acilis_baslangic = time.perf_counter()
+        self.acilis_sureleri = {}   # Soğuk açılış süre dökümü (ms)
         master.title("Stok ve Reçete Yönetim Sistemi")
         master.geometry("1200x800")
         
@@ -311,12 +1930,72 @@ class MalzemeTakipUygulamasi:
         
         master.configure(bg=self.RENKLER["bg_ana"])
 
-        self.db = Veritabani()
+        t = time.perf_counter()
+        siteler = siteleri_oku()
+        self.db = FedereVeritabani(siteler) if siteler else Veritabani()
+        # Federasyonda her atölye kendi alt klasörüne yedeklenir (dosya adları çakışmasın diye).
+        if isinstance(self.db, FedereVeritabani):
+            self.yedekleyiciler = [YedeklemeYoneticisi(site_db, yedek_dizini=os.path.join(YEDEK_DIR, self._klasor_adi(site)))
+                                   for site, site_db in zip(self.db.site_adlari, self.db.siteler)]
+        else:
+            self.yedekleyiciler = [YedeklemeYoneticisi(self.db)]
+        for yedekleyici in self.yedekleyiciler:
+            yedekleyici.zamanlanmis_baslat()
+        # Her veritabanının (federasyonda her atölyenin) kendi kuyruğu vardır; bekleyen siparişler açılışta işlenir.
+        self.kuyruklar = {}
+        for site_db in getattr(self.db, 'siteler', [self.db]):
+            self._kuyruk_al(site_db)
+        self._kuyruk_islenen = 0
+        self._degisiklik_imleci = self.db.degisiklik_imleci()
+        self._son_budama = time.monotonic()
+        self.maliyet_motoru = MaliyetMotoru(self.db)
+        t = self._sure_kaydet('veritabanı', t)
         self._stilleri_tanimla()
+        t = self._sure_kaydet('stiller', t)
         self._arayuz_olustur()
-        self.veri_yenile() 
+        self._sure_kaydet('arayüz', t)
         self.notebook.select(self.tab_index_map['Stok İşlemleri'])
 
+        if hizli_acilis:
+            # Pencere önce boş kabukla çizilir; görünen sekme ve verisi ilk boşta yüklenir,
+            # diğer sekmeler ilk seçildiklerinde kurulur.
+            self.master.after_idle(self._ertelenmis_yukleme)
+        else:
+            for ad in self.tab_index_map:
+                self._sekme_hazirla(ad, veri_yukle=False)
+            self.veri_yenile()
+            self._acilis_raporla()
+            self._sekme_degisimini_izle()
+        self.master.after(KUYRUK_IZLEME_MS, self._kuyruk_izle)
+        self.master.after(SENKRON_ARALIGI_MS, self._senkronize)
+
+    @staticmethod
+    def _klasor_adi(ad):
+        return "".join(c if c.isalnum() or c in "-_" else "_" for c in ad) or "atolye"
+
+    def _sure_kaydet(self, anahtar, baslangic):
+        simdi = time.perf_counter()
+        self.acilis_sureleri[anahtar] = (simdi - baslangic) * 1000
+        return simdi
+
+    def _ertelenmis_yukleme(self):
+        t = time.perf_counter()
+        self._sekme_hazirla(self.notebook.tab(self.notebook.select(), 'text'), veri_yukle=False)
+        self._degisiklik_imleci = self.db.degisiklik_imleci()
+        self.malzeme_tablosunu_doldur()
+        self._sure_kaydet('ilk veri', t)
+        self._acilis_raporla()
+        self._sekme_degisimini_izle()
+
+    def _sekme_degisimini_izle(self):
+        self.notebook.bind('<<NotebookTabChanged>>', lambda e: self._sekme_hazirla(self.notebook.tab(self.notebook.select(), 'text')))
+
+    def _acilis_raporla(self):
+        self.master.update_idletasks()
+        self._sure_kaydet('toplam', self._acilis_baslangic)
+        detay = ", ".join(f"{k} {v:.0f}" for k, v in self.acilis_sureleri.items() if k != 'toplam')
+        self.goster_bildirim(f"Açılış: {self.acilis_sureleri['toplam']:.0f} ms ({detay})", "bilgi")
+
     def _stilleri_tanimla(self):
         self.stil = ttk.Style()
         self.stil.theme_use('clam') 
@@ -371,17 +2050,24 @@ class MalzemeTakipUygulamasi:
         self.kritik_kart.pack(fill='x', pady=(0, 30))
         self.lbl_kritik = ttk.Label(self.kritik_kart, text="0 Ürün", font=('Segoe UI', 16, 'bold'), foreground="#e74c3c", background=self.RENKLER["bg_sidebar"])
         self.lbl_kritik.pack(anchor='center')
+        self.lbl_erisilemeyen = ttk.Label(self.kritik_kart, text="", font=('Segoe UI', 8), foreground="#f39c12", background=self.RENKLER["bg_sidebar"], wraplength=200)
 
         ttk.Label(sol_frame, text="HIZLI İŞLEMLER", font=('Segoe UI', 9, 'bold'), foreground="#bdc3c7", background=self.RENKLER["bg_sidebar"]).pack(anchor='w', pady=(10, 5))
-        ttk.Button(sol_frame, text="  📦  Yeni Malzeme Ekle", style='Sidebar.TButton', command=lambda: self.notebook.select(self.tab_index_map['Stok İşlemleri'])).pack(fill='x', pady=2)
-        ttk.Button(sol_frame, text="  🔄  Stok Güncelle", style='Sidebar.TButton', command=lambda: self.notebook.select(self.tab_index_map['Stok İşlemleri'])).pack(fill='x', pady=2)
+        ttk.Button(sol_frame, text="  📦  Yeni Malzeme Ekle", style='Sidebar.TButton', command=lambda: self.sekme_ac('Stok İşlemleri')).pack(fill='x', pady=2)
+        ttk.Button(sol_frame, text="  🔄  Stok Güncelle", style='Sidebar.TButton', command=lambda: self.sekme_ac('Stok İşlemleri')).pack(fill='x', pady=2)
         
         tk.Frame(sol_frame, height=1, bg="#34495e").pack(fill='x', pady=15)
         
         ttk.Label(sol_frame, text="MODÜLLER", font=('Segoe UI', 9, 'bold'), foreground="#bdc3c7", background=self.RENKLER["bg_sidebar"]).pack(anchor='w', pady=(0, 5))
-        ttk.Button(sol_frame, text="  📑  Reçete Yönetimi", style='Sidebar.TButton', command=lambda: self.notebook.select(self.tab_index_map['Reçete Yönetimi'])).pack(fill='x', pady=2)
-        ttk.Button(sol_frame, text="  🛒  Sipariş İşle", style='Sidebar.TButton', command=lambda: self.notebook.select(self.tab_index_map['Sipariş İşle'])).pack(fill='x', pady=2)
-        ttk.Button(sol_frame, text="  📜  İşlem Geçmişi", style='Sidebar.TButton', command=lambda: self.notebook.select(self.tab_index_map['İşlem Geçmişi'])).pack(fill='x', pady=2)
+        ttk.Button(sol_frame, text="  📑  Reçete Yönetimi", style='Sidebar.TButton', command=lambda: self.sekme_ac('Reçete Yönetimi')).pack(fill='x', pady=2)
+        ttk.Button(sol_frame, text="  🛒  Sipariş İşle", style='Sidebar.TButton', command=lambda: self.sekme_ac('Sipariş İşle')).pack(fill='x', pady=2)
+        ttk.Button(sol_frame, text="  📜  İşlem Geçmişi", style='Sidebar.TButton', command=lambda: self.sekme_ac('İşlem Geçmişi')).pack(fill='x', pady=2)
+
+        tk.Frame(sol_frame, height=1, bg="#34495e").pack(fill='x', pady=15)
+
+        ttk.Label(sol_frame, text="YEDEKLEME", font=('Segoe UI', 9, 'bold'), foreground="#bdc3c7", background=self.RENKLER["bg_sidebar"]).pack(anchor='w', pady=(0, 5))
+        ttk.Button(sol_frame, text="  💾  Yedek Al", style='Sidebar.TButton', command=self.yedek_al_islemi).pack(fill='x', pady=2)
+        ttk.Button(sol_frame, text="  ♻️  Yedekten Geri Yükle", style='Sidebar.TButton', command=self.yedekten_geri_yukle_islemi).pack(fill='x', pady=2)
 
         ttk.Button(sol_frame, text="🗑️ Seçiliyi Sil", style='Danger.TButton', command=self.malzeme_kaldir_islemi).pack(fill='x', pady=20, side='bottom')
 
@@ -409,33 +2095,67 @@ class MalzemeTakipUygulamasi:
         self.notebook.pack(fill='both', expand=True)
 
         self.tab_index_map = {}
+        # Sekme içerikleri burada kurulmaz; _sekme_hazirla ilk seçimde kurucu ve veri yükleyiciyi çalıştırır.
+        self._sekme_kuruculari = {}
+        self._kurulu_sekmeler = set()
         
         self.tab_stok_islemleri = tk.Frame(self.notebook, bg="white", padx=20, pady=20)
         self.notebook.add(self.tab_stok_islemleri, text="Stok İşlemleri")
-        self._form_hizli_islem_olustur(self.tab_stok_islemleri)
+        self._sekme_kuruculari['Stok İşlemleri'] = (self._form_hizli_islem_olustur, self.tab_stok_islemleri, self.arama_yap)
         self.tab_index_map['Stok İşlemleri'] = 0
         
         self.tab_recete = tk.Frame(self.notebook, bg="white", padx=20, pady=20)
         self.notebook.add(self.tab_recete, text="Reçete Yönetimi")
-        self._form_recete_yonetimi(self.tab_recete)
+        self._sekme_kuruculari['Reçete Yönetimi'] = (self._form_recete_yonetimi, self.tab_recete, self.recete_listesini_guncelle)
         self.tab_index_map['Reçete Yönetimi'] = 1
         
         self.tab_siparis = tk.Frame(self.notebook, bg="white", padx=20, pady=20)
         self.notebook.add(self.tab_siparis, text="Sipariş İşle")
-        self._form_siparis_isle(self.tab_siparis)
+        self._sekme_kuruculari['Sipariş İşle'] = (self._form_siparis_isle, self.tab_siparis, self._siparis_sekmesi_yukle)
         self.tab_index_map['Sipariş İşle'] = 2
         
         self.tab_gecmis = tk.Frame(self.notebook, bg="white", padx=20, pady=20)
         self.notebook.add(self.tab_gecmis, text="İşlem Geçmişi")
-        self._gecmis_tablosu_olustur(self.tab_gecmis)
+        self._sekme_kuruculari['İşlem Geçmişi'] = (self._gecmis_tablosu_olustur, self.tab_gecmis, self.gecmis_yenile)
         self.tab_index_map['İşlem Geçmişi'] = 3
         
+        self.tab_maliyet = tk.Frame(self.notebook, bg="white", padx=20, pady=20)
+        self.notebook.add(self.tab_maliyet, text="Maliyet Analizi")
+        self._sekme_kuruculari['Maliyet Analizi'] = (self._maliyet_tablosu_olustur, self.tab_maliyet, self.maliyet_tablosunu_doldur)
+        self.tab_index_map['Maliyet Analizi'] = 4
+
+        if isinstance(self.db, FedereVeritabani):
+            self.tab_atolyeler = tk.Frame(self.notebook, bg="white", padx=20, pady=20)
+            self.notebook.add(self.tab_atolyeler, text="Atölyeler")
+            self._sekme_kuruculari['Atölyeler'] = (self._atolye_ozeti_olustur, self.tab_atolyeler, self.atolye_ozetini_doldur)
+            self.tab_index_map['Atölyeler'] = 5
+        
         self.lbl_bildirim = tk.Label(self.master, text="", font=('Segoe UI', 10, 'bold'), pady=0, borderwidth=0)
 
+    def _sekme_hazirla(self, ad, veri_yukle=True):
+        """Sekmeyi ilk kullanımda kurar ve yalnızca onun verisini yükler."""
+        if ad in self._kurulu_sekmeler:
+            return
+        t = time.perf_counter()
+        kurucu, frame, yukleyici = self._sekme_kuruculari[ad]
+        kurucu(frame)
+        self._kurulu_sekmeler.add(ad)
+        if veri_yukle:
+            yukleyici()
+        self._sure_kaydet(f"sekme: {ad}", t)
+
+    def sekme_ac(self, ad):
+        self.notebook.select(self.tab_index_map[ad])
+        self._sekme_hazirla(ad)
+
+    def _siparis_sekmesi_yukle(self):
+        self.recete_listesini_guncelle()
+        self.kuyruk_durumu_yenile()
+
     # --- ALT BİLEŞENLER ---
     
     def _malzeme_tablosu_olustur(self, parent):
-        cols = ('id', 'ad', 'miktar', 'kritik_esik')
+        cols = ('id', 'ad', 'miktar', 'kritik_esik', 'birim_maliyet')
         self.stok_tablosu = ttk.Treeview(parent, columns=cols, show='headings', selectmode='browse', height=8)
         sb = ttk.Scrollbar(parent, orient="vertical", command=self.stok_tablosu.yview)
         self.stok_tablosu.configure(yscrollcommand=sb.set)
@@ -447,11 +2167,13 @@ class MalzemeTakipUygulamasi:
         self.stok_tablosu.heading('ad', text='Malzeme Adı', anchor='w')
         self.stok_tablosu.heading('miktar', text='Miktar', anchor='e')
         self.stok_tablosu.heading('kritik_esik', text='Kritik Eşik', anchor='e')
+        self.stok_tablosu.heading('birim_maliyet', text='Birim Maliyet', anchor='e')
 
         self.stok_tablosu.column('id', width=50, anchor='w', stretch=False)
         self.stok_tablosu.column('ad', width=350, anchor='w', stretch=True)
         self.stok_tablosu.column('miktar', width=120, anchor='e')
         self.stok_tablosu.column('kritik_esik', width=120, anchor='e')
+        self.stok_tablosu.column('birim_maliyet', width=120, anchor='e')
 
         self.stok_tablosu.bind('<Double-1>', self.secili_malzeme_stok_guncelle_otomatik)
         
@@ -462,8 +2184,13 @@ class MalzemeTakipUygulamasi:
         cols = ('id', 'tarih', 'islem', 'aciklama', 'miktar')
         header_frame = tk.Frame(parent, bg="white")
         header_frame.pack(fill='x', pady=(0, 10))
-        tk.Label(header_frame, text="Son İşlemler", font=('Segoe UI', 12, 'bold'), bg="white", fg="#2c3e50").pack(side='left')
+        self.lbl_gecmis_baslik = tk.Label(header_frame, text="Son İşlemler", font=('Segoe UI', 12, 'bold'), bg="white", fg="#2c3e50")
+        self.lbl_gecmis_baslik.pack(side='left')
         ttk.Button(header_frame, text="🗑️ Geçmişi Temizle", style='Danger.TButton', command=self._gecmisi_temizle_islemi).pack(side='right')
+        self.ent_gecmis_arama = ttk.Entry(header_frame, width=30)
+        self.ent_gecmis_arama.pack(side='right', padx=10)
+        self.ent_gecmis_arama.bind('<KeyRelease>', self._gecmis_arama_zamanla)
+        tk.Label(header_frame, text="🔍", font=('Segoe UI', 12), bg="white").pack(side='right')
         
         self.trv_gecmis = ttk.Treeview(parent, columns=cols, show='headings', height=6)
         sb = ttk.Scrollbar(parent, orient="vertical", command=self.trv_gecmis.yview)
@@ -484,6 +2211,73 @@ class MalzemeTakipUygulamasi:
         self.trv_gecmis.pack(side='left', fill='both', expand=True)
         sb.pack(side='right', fill='y')
 
+    def _maliyet_tablosu_olustur(self, parent):
+        cols = ('urun', 'bilesen', 'maliyet')
+        header_frame = tk.Frame(parent, bg="white")
+        header_frame.pack(fill='x', pady=(0, 10))
+        tk.Label(header_frame, text="Ürün Başına Malzeme Maliyeti", font=('Segoe UI', 12, 'bold'), bg="white", fg="#2c3e50").pack(side='left')
+
+        self.trv_maliyet = ttk.Treeview(parent, columns=cols, show='headings', height=6)
+        sb = ttk.Scrollbar(parent, orient="vertical", command=self.trv_maliyet.yview)
+        self.trv_maliyet.configure(yscrollcommand=sb.set)
+
+        self.trv_maliyet.heading('urun', text='Ürün', anchor='w')
+        self.trv_maliyet.heading('bilesen', text='Bileşen Sayısı', anchor='e')
+        self.trv_maliyet.heading('maliyet', text='Birim Maliyet', anchor='e')
+
+        self.trv_maliyet.column('urun', width=350, stretch=True)
+        self.trv_maliyet.column('bilesen', width=120, anchor='e')
+        self.trv_maliyet.column('maliyet', width=120, anchor='e')
+
+        self.trv_maliyet.pack(side='left', fill='both', expand=True)
+        sb.pack(side='right', fill='y')
+
+    def _atolye_ozeti_olustur(self, parent):
+        header_frame = tk.Frame(parent, bg="white")
+        header_frame.pack(fill='x', pady=(0, 10))
+        tk.Label(header_frame, text="Atölye Özeti ve Konsolide Stok", font=('Segoe UI', 12, 'bold'), bg="white", fg="#2c3e50").pack(side='left')
+        ttk.Button(header_frame, text="🔄 Yenile", style='Primary.TButton', command=self.atolye_ozetini_doldur).pack(side='right')
+
+        tablolar = tk.Frame(parent, bg="white")
+        tablolar.pack(fill='both', expand=True)
+
+        self.trv_atolye = ttk.Treeview(tablolar, columns=('site', 'malzeme', 'kritik'), show='headings', height=6)
+        self.trv_atolye.tag_configure('erisilemiyor', foreground='#c0392b')
+        self.trv_atolye.heading('site', text='Atölye', anchor='w')
+        self.trv_atolye.heading('malzeme', text='Malzeme', anchor='e')
+        self.trv_atolye.heading('kritik', text='Kritik', anchor='e')
+        self.trv_atolye.column('site', width=160)
+        self.trv_atolye.column('malzeme', width=80, anchor='e')
+        self.trv_atolye.column('kritik', width=80, anchor='e')
+        self.trv_atolye.pack(side='left', fill='y', padx=(0, 10))
+
+        self.trv_konsolide = ttk.Treeview(tablolar, columns=('ad', 'miktar', 'site', 'kritik'), show='headings', height=6)
+        sb = ttk.Scrollbar(tablolar, orient="vertical", command=self.trv_konsolide.yview)
+        self.trv_konsolide.configure(yscrollcommand=sb.set)
+        self.trv_konsolide.tag_configure('kritik', background='#fadbd8', foreground='#c0392b')
+        self.trv_konsolide.heading('ad', text='Malzeme', anchor='w')
+        self.trv_konsolide.heading('miktar', text='Toplam Miktar', anchor='e')
+        self.trv_konsolide.heading('site', text='Atölye Sayısı', anchor='e')
+        self.trv_konsolide.heading('kritik', text='Kritik Atölye', anchor='e')
+        self.trv_konsolide.column('ad', width=250, stretch=True)
+        self.trv_konsolide.column('miktar', width=110, anchor='e')
+        self.trv_konsolide.column('site', width=100, anchor='e')
+        self.trv_konsolide.column('kritik', width=100, anchor='e')
+        self.trv_konsolide.pack(side='left', fill='both', expand=True)
+        sb.pack(side='right', fill='y')
+
+    def atolye_ozetini_doldur(self):
+        for tablo in (self.trv_atolye, self.trv_konsolide):
+            for i in tablo.get_children():
+                tablo.delete(i)
+        for site, kritik, toplam in self.db.site_kritik_sayilari():
+            if kritik is None:
+                self.trv_atolye.insert('', 'end', values=(site, "—", "erişilemiyor"), tags=['erisilemiyor'])
+            else:
+                self.trv_atolye.insert('', 'end', values=(site, toplam, kritik))
+        for ad, miktar, site_sayisi, kritik in self.db.konsolide_stok():
+            self.trv_konsolide.insert('', 'end', values=(ad, f"{miktar:.2f}", site_sayisi, kritik), tags=['kritik'] if kritik else [])
+
     def _form_recete_yonetimi(self, parent):
         left_frame = tk.Frame(parent, bg="white")
         left_frame.pack(side='left', fill='y', padx=(0, 25))
@@ -535,8 +2329,41 @@ class MalzemeTakipUygulamasi:
         tk.Label(center_frame, text="Sipariş Adedi:", bg="white", font=('Segoe UI', 11)).grid(row=1, column=0, padx=10, pady=15, sticky='e')
         self.ent_siparis_adet = ttk.Entry(center_frame, width=37)
         self.ent_siparis_adet.grid(row=1, column=1, padx=10, ipady=3)
+        self.var_siparis_acil = tk.BooleanVar(value=False)
+        tk.Checkbutton(center_frame, text="Acil (öncelikli)", variable=self.var_siparis_acil,
+                       bg="white", activebackground="white", font=('Segoe UI', 10)).grid(row=2, column=1, sticky='w', padx=10)
         ttk.Button(center_frame, text="Üret ve Stoktan Düş", style='Primary.TButton', command=self.siparis_isle).grid(row=2, column=1, pady=20, sticky='e')
 
+        header_frame = tk.Frame(parent, bg="white")
+        header_frame.pack(fill='x', pady=(0, 10))
+        tk.Label(header_frame, text="Sipariş Kuyruğu", font=('Segoe UI', 12, 'bold'), bg="white", fg="#2c3e50").pack(side='left')
+        self.lbl_kuyruk_ozet = tk.Label(header_frame, text="", font=('Segoe UI', 10), bg="white", fg="#7f8c8d")
+        self.lbl_kuyruk_ozet.pack(side='right')
+
+        cols = ('no', 'tarih', 'urun', 'adet', 'durum', 'sonuc')
+        self.trv_kuyruk = ttk.Treeview(parent, columns=cols, show='headings', height=5)
+        sb = ttk.Scrollbar(parent, orient="vertical", command=self.trv_kuyruk.yview)
+        self.trv_kuyruk.configure(yscrollcommand=sb.set)
+        self.trv_kuyruk.tag_configure('hata', background='#fadbd8', foreground='#c0392b')
+        self.trv_kuyruk.tag_configure('bekliyor', background='#fcf3cf', foreground='#d35400')
+
+        self.trv_kuyruk.heading('no', text='No', anchor='w')
+        self.trv_kuyruk.heading('tarih', text='Tarih', anchor='w')
+        self.trv_kuyruk.heading('urun', text='Ürün', anchor='w')
+        self.trv_kuyruk.heading('adet', text='Adet', anchor='e')
+        self.trv_kuyruk.heading('durum', text='Durum', anchor='w')
+        self.trv_kuyruk.heading('sonuc', text='Sonuç', anchor='w')
+
+        self.trv_kuyruk.column('no', width=50, stretch=False)
+        self.trv_kuyruk.column('tarih', width=130)
+        self.trv_kuyruk.column('urun', width=180)
+        self.trv_kuyruk.column('adet', width=60, anchor='e')
+        self.trv_kuyruk.column('durum', width=100)
+        self.trv_kuyruk.column('sonuc', width=300, stretch=True)
+
+        self.trv_kuyruk.pack(side='left', fill='both', expand=True)
+        sb.pack(side='right', fill='y')
+
     def _form_hizli_islem_olustur(self, parent):
         form_container = ttk.Frame(parent, style="Card.TFrame")
         form_container.pack(fill='both', expand=True)
@@ -557,7 +2384,11 @@ class MalzemeTakipUygulamasi:
         self.ent_ekle_esik = ttk.Entry(form_ekle, width=15)
         self.ent_ekle_esik.insert(0, "10")
         self.ent_ekle_esik.grid(row=2, column=1, padx=10, pady=5, sticky='w')
-        ttk.Button(form_ekle, text="Malzemeyi Kaydet", style='Success.TButton', command=self._kaydet_malzeme).grid(row=3, column=0, columnspan=2, pady=10)
+        ttk.Label(form_ekle, text="Birim Maliyet:", style="Card.TLabel").grid(row=3, column=0, padx=10, pady=5, sticky='e')
+        self.ent_ekle_maliyet = ttk.Entry(form_ekle, width=15)
+        self.ent_ekle_maliyet.insert(0, "0")
+        self.ent_ekle_maliyet.grid(row=3, column=1, padx=10, pady=5, sticky='w')
+        ttk.Button(form_ekle, text="Malzemeyi Kaydet", style='Success.TButton', command=self._kaydet_malzeme).grid(row=4, column=0, columnspan=2, pady=10)
 
         # Güncelle
         frm_guncelle = ttk.LabelFrame(form_container, text="🔄 MEVCUT STOK GÜNCELLE", padding=15, style="TLabelframe")
@@ -567,6 +2398,7 @@ class MalzemeTakipUygulamasi:
         ttk.Label(form_guncelle, text="Malzeme Seçimi:", style="Card.TLabel").grid(row=0, column=0, padx=10, pady=5, sticky='e')
         self.cmb_guncelle_malzeme = ttk.Combobox(form_guncelle, state="readonly", width=30)
         self.cmb_guncelle_malzeme.grid(row=0, column=1, padx=10, pady=5)
+        self.cmb_guncelle_malzeme.bind('<<ComboboxSelected>>', self._guncelle_maliyetini_goster)
         ttk.Label(form_guncelle, text="İşlem Miktarı:", style="Card.TLabel").grid(row=1, column=0, padx=10, pady=5, sticky='e')
         self.ent_guncelle_miktar = ttk.Entry(form_guncelle, width=15)
         self.ent_guncelle_miktar.grid(row=1, column=1, padx=10, pady=5, sticky='w')
@@ -578,6 +2410,10 @@ class MalzemeTakipUygulamasi:
         tk.Radiobutton(frm_radio, text="Çıkar (-)", variable=self.var_guncelle_islem, value="cikar", 
                        bg="white", activebackground="white", font=('Segoe UI', 10)).pack(side='left', padx=10)
         ttk.Button(form_guncelle, text="Stok Güncelle", style='Primary.TButton', command=self._guncelle_stok).grid(row=3, column=0, columnspan=2, pady=10)
+        ttk.Label(form_guncelle, text="Yeni Birim Maliyet:", style="Card.TLabel").grid(row=4, column=0, padx=10, pady=5, sticky='e')
+        self.ent_guncelle_maliyet = ttk.Entry(form_guncelle, width=15)
+        self.ent_guncelle_maliyet.grid(row=4, column=1, padx=10, pady=5, sticky='w')
+        ttk.Button(form_guncelle, text="Maliyeti Güncelle", style='Primary.TButton', command=self._guncelle_maliyet).grid(row=5, column=0, columnspan=2, pady=10)
 
     # --- İŞ MANTIĞI ---
 
@@ -585,24 +2421,27 @@ class MalzemeTakipUygulamasi:
         for i in self.stok_tablosu.get_children():
             self.stok_tablosu.delete(i)
         
-        self.cmb_guncelle_malzeme['values'] = []
         combo_values = []
         veriler = self.db.malzemeleri_oku()
         
-        for mid, ad, miktar, esik in veriler:
+        for mid, ad, miktar, esik, maliyet in veriler:
             if filtre and filtre.lower() not in ad.lower():
                 continue
             combo_values.append(f"{ad} (ID: {mid})")
-            tags = []
-            if miktar <= esik:
-                tags.append('kritik')
-            elif miktar <= esik * 1.5:
-                tags.append('yaklasan')
-            self.stok_tablosu.insert('', 'end', values=(mid, ad, f"{miktar:.2f}", esik), tags=tags)
+            self.stok_tablosu.insert('', 'end', iid=str(mid), values=(mid, ad, f"{miktar:.2f}", esik, f"{maliyet:.2f}"), tags=self._stok_etiketleri(miktar, esik))
         
-        self.cmb_guncelle_malzeme['values'] = combo_values
+        if hasattr(self, 'cmb_guncelle_malzeme'):
+            self.cmb_guncelle_malzeme['values'] = combo_values
         self.kritik_durumu_goster()
 
+    @staticmethod
+    def _stok_etiketleri(miktar, esik):
+        if miktar <= esik:
+            return ['kritik']
+        if miktar <= esik * 1.5:
+            return ['yaklasan']
+        return []
+
     def arama_yap(self, event=None):
         aranan = self.ent_arama.get()
         self.malzeme_tablosunu_doldur(aranan)
@@ -614,18 +2453,26 @@ class MalzemeTakipUygulamasi:
             self.lbl_kritik.config(foreground="#e74c3c")
         else:
             self.lbl_kritik.config(foreground="#2ecc71")
+        # Erişilemeyen atölyelerin stoğu sayılara dahil değildir; bu durum gizlenmez.
+        erisilemeyen = self.db.erisilemeyenler() if isinstance(self.db, FedereVeritabani) else []
+        if erisilemeyen:
+            self.lbl_erisilemeyen.config(text="Erişilemeyen atölye: " + ", ".join(erisilemeyen))
+            self.lbl_erisilemeyen.pack(anchor='center', pady=(5, 0))
+        else:
+            self.lbl_erisilemeyen.pack_forget()
 
     def _kaydet_malzeme(self):
         ad = self.ent_ekle_ad.get().strip()
         try:
             mik = float(self.ent_ekle_miktar.get())
             esik = int(self.ent_ekle_esik.get())
+            maliyet = float(self.ent_ekle_maliyet.get() or 0)
             if not ad: raise ValueError
         except:
             self.goster_bildirim("Hatalı giriş!", "hata")
             return
         
-        res = self.db.malzeme_ekle(ad, mik, esik)
+        res = self.db.malzeme_ekle(ad, mik, esik, maliyet)
         if res is True:
             self.goster_bildirim(f"'{ad}' başarıyla eklendi.", "bilgi")
             self.veri_yenile()
@@ -656,14 +2503,43 @@ class MalzemeTakipUygulamasi:
         else:
             self.goster_bildirim(res, "hata")
 
+    def _guncelle_maliyet(self):
+        val = self.cmb_guncelle_malzeme.get()
+        if not val:
+            self.goster_bildirim("Lütfen bir malzeme seçin.", "uyarı")
+            return
+        try:
+            mid = int(val.split('(ID: ')[1].strip(')'))
+            maliyet = float(self.ent_guncelle_maliyet.get())
+        except:
+            self.goster_bildirim("Hatalı maliyet girişi!", "hata")
+            return
+        res = self.db.birim_maliyet_guncelle(mid, maliyet)
+        if res is True:
+            self.goster_bildirim("Birim maliyet güncellendi.", "bilgi")
+            self.ent_guncelle_maliyet.delete(0, 'end')
+        else:
+            self.goster_bildirim(res, "hata")
+
+    def _guncelle_maliyetini_goster(self, event=None):
+        # Seçilen malzemenin mevcut birim maliyeti düzenlenmek üzere kutuya yazılır.
+        val = self.cmb_guncelle_malzeme.get()
+        if '(ID: ' not in val:
+            return
+        iid = val.split('(ID: ')[1].strip(')')
+        self.ent_guncelle_maliyet.delete(0, 'end')
+        if self.stok_tablosu.exists(iid):
+            self.ent_guncelle_maliyet.insert(0, self.stok_tablosu.set(iid, 'birim_maliyet'))
+
     def secili_malzeme_stok_guncelle_otomatik(self, event):
         selected = self.stok_tablosu.selection()
         if not selected: return
         item = self.stok_tablosu.item(selected[0])
         val = item['values'] 
-        self.notebook.select(self.tab_index_map['Stok İşlemleri'])
+        self.sekme_ac('Stok İşlemleri')
         hedef_str = f"{val[1]} (ID: {val[0]})"
         self.cmb_guncelle_malzeme.set(hedef_str)
+        self._guncelle_maliyetini_goster()
         self.ent_guncelle_miktar.focus_set()
 
     def malzeme_kaldir_islemi(self):
@@ -685,16 +2561,20 @@ class MalzemeTakipUygulamasi:
 
     def recete_listesini_guncelle(self):
         tarifler = self.db.tarifleri_cek()
-        self.lst_urunler.delete(0, 'end')
-        self.cmb_siparis_urun['values'] = tarifler
-        for t in tarifler:
-            self.lst_urunler.insert('end', t)
+        if hasattr(self, 'cmb_siparis_urun'):
+            self.cmb_siparis_urun['values'] = tarifler
+        if hasattr(self, 'lst_urunler'):
+            self.lst_urunler.delete(0, 'end')
+            for t in tarifler:
+                self.lst_urunler.insert('end', t)
 
     def recete_detay_goster(self):
         selection = self.lst_urunler.curselection()
         if not selection: return
         urun_adi = self.lst_urunler.get(selection[0])
-        self.lbl_recete_baslik.config(text=f"Reçete: {urun_adi}")
+        maliyet = self.maliyet_motoru.urun_maliyeti(urun_adi)
+        maliyet_metni = f"   —   Birim Maliyet: {maliyet:.2f}" if maliyet is not None else ""
+        self.lbl_recete_baslik.config(text=f"Reçete: {urun_adi}{maliyet_metni}")
         for i in self.trv_recete.get_children():
             self.trv_recete.delete(i)
         bilesenler = self.db.tarif_bilesenlerini_cek(urun_adi)
@@ -784,21 +2664,174 @@ class MalzemeTakipUygulamasi:
         if not urun:
             self.goster_bildirim("Ürün seçilmedi.", "uyarı")
             return
-        if messagebox.askyesno("Onay", f"{adet} adet '{urun}' üretilecek ve stoktan düşülecek. Onaylıyor musunuz?"):
-            res = self.db.siparis_isleme_ve_stok_dus(urun, adet)
-            if res is True:
-                messagebox.showinfo("Başarılı", "Üretim kaydı oluşturuldu, stoklar güncellendi.")
-                self.ent_siparis_adet.delete(0, 'end')
+        # Onay penceresi yerine kuyruğa yazılır; sonuç 'Sipariş Kuyruğu' tablosunda izlenir.
+        hedef_db, urun_ad = self.db.kuyruk_hedefi(urun)
+        res = self._kuyruk_al(hedef_db).ekle(urun_ad, adet, 1 if self.var_siparis_acil.get() else 0)
+        if isinstance(res, str):
+            self.goster_bildirim(res, "hata")
+            return
+        self.goster_bildirim(f"Sipariş #{res} kuyruğa alındı: {adet} adet '{urun}'.", "bilgi")
+        self.ent_siparis_adet.delete(0, 'end')
+        self.kuyruk_durumu_yenile()
+
+    def _kuyruk_al(self, db):
+        if db.db_yolu not in self.kuyruklar:
+            kuyruk = SiparisKuyrugu(db)
+            kuyruk.baslat()
+            self.kuyruklar[db.db_yolu] = kuyruk
+        return self.kuyruklar[db.db_yolu]
+
+    def _kuyruk_izle(self):
+        # Kuyruk işçisi Tkinter'a dokunamaz; işlenen sayaç değiştiyse ekran ana thread'de yenilenir.
+        islenen = sum(k.islenen_sayisi for k in self.kuyruklar.values())
+        for kuyruk in self.kuyruklar.values():
+            if kuyruk.son_hata:
+                self.goster_bildirim(kuyruk.son_hata, "hata")
+                kuyruk.son_hata = None
+        if islenen != self._kuyruk_islenen:
+            self._kuyruk_islenen = islenen
+            # Stok ve geçmiş değişiklikleri değişiklik günlüğü üzerinden _senkronize ile gelir.
+            if 'Sipariş İşle' in self._kurulu_sekmeler:
+                self.kuyruk_durumu_yenile()
+        self.master.after(KUYRUK_IZLEME_MS, self._kuyruk_izle)
+
+    def _senkronize(self):
+        """Diğer istemcilerin (ve arka plan işçilerinin) değişikliklerini yalnızca fark olarak uygular."""
+        try:
+            sonuc = self.db.degisiklikleri_cek(self._degisiklik_imleci)
+            if sonuc is None:
                 self.veri_yenile()
             else:
-                messagebox.showerror("İşlem Başarısız", str(res))
+                # İmleç ancak değişiklikler uygulandıktan sonra ilerler; yarıda kalan tur bir sonrakinde tekrarlanır.
+                yeni_imlec, degisiklikler = sonuc
+                if degisiklikler:
+                    self._degisiklikleri_uygula(degisiklikler)
+                self._degisiklik_imleci = yeni_imlec
+            if time.monotonic() - self._son_budama >= DEGISIKLIK_BUDAMA_ARALIGI_SN:
+                self._son_budama = time.monotonic()
+                self.db.degisiklik_gunlugunu_buda()
+        except sqlite3.Error:
+            pass    # Geçici hata (ör. kilitli veritabanı); bir sonraki turda tekrar denenir
+        finally:
+            self.master.after(SENKRON_ARALIGI_MS, self._senkronize)
+
+    def _degisiklikleri_uygula(self, degisiklikler):
+        # Aynı kayıt birden çok kez değişmişse yalnızca son durumu önemlidir.
+        malzemeler, gecmis, urunler = {}, {}, set()
+        for tablo, islem, kayit_id, urun_ad in degisiklikler:
+            if tablo == 'malzemeler':
+                malzemeler[kayit_id] = islem
+            elif tablo == 'islem_gecmisi':
+                gecmis[kayit_id] = islem
+            else:
+                urunler.add(urun_ad)
+
+        if malzemeler:
+            filtre = self.ent_arama.get().lower()
+            combo_degisti = False
+            for mid, islem in malzemeler.items():
+                if islem == 'DELETE' and self.stok_tablosu.exists(str(mid)):
+                    self.stok_tablosu.delete(str(mid))
+                    combo_degisti = True
+            for mid, ad, miktar, esik, maliyet in self.db.malzemeleri_getir(m for m, i in malzemeler.items() if i != 'DELETE'):
+                iid = str(mid)
+                degerler = (mid, ad, f"{miktar:.2f}", esik, f"{maliyet:.2f}")
+                if self.stok_tablosu.exists(iid):
+                    combo_degisti |= self.stok_tablosu.set(iid, 'ad') != ad
+                    self.stok_tablosu.item(iid, values=degerler, tags=self._stok_etiketleri(miktar, esik))
+                elif not filtre or filtre in ad.lower():
+                    self.stok_tablosu.insert('', 'end', iid=iid, values=degerler, tags=self._stok_etiketleri(miktar, esik))
+                    combo_degisti = True
+                else:
+                    continue
+                if miktar <= esik:
+                    self.stok_tablosu.move(iid, '', 0)
+            if combo_degisti and hasattr(self, 'cmb_guncelle_malzeme'):
+                self.cmb_guncelle_malzeme['values'] = [f"{self.stok_tablosu.set(i, 'ad')} (ID: {i})" for i in self.stok_tablosu.get_children()]
+            self.kritik_durumu_goster()
+
+        # Arama sonuçları gösterilirken canlı satır eklenmez; arama kutusu boşalınca liste yenilenir.
+        if gecmis and 'İşlem Geçmişi' in self._kurulu_sekmeler and not self.ent_gecmis_arama.get().strip():
+            for kid, islem in gecmis.items():
+                if islem == 'DELETE' and self.trv_gecmis.exists(str(kid)):
+                    self.trv_gecmis.delete(str(kid))
+            for row in self.db.islem_kayitlarini_getir(k for k, i in gecmis.items() if i != 'DELETE'):
+                if self.trv_gecmis.exists(str(row[0])):
+                    self.trv_gecmis.item(str(row[0]), values=row)
+                else:
+                    self.trv_gecmis.insert('', 0, iid=str(row[0]), values=row)
+            fazla = self.trv_gecmis.get_children()[100:]
+            if fazla:
+                self.trv_gecmis.delete(*fazla)
+
+        if (malzemeler or urunler) and 'Maliyet Analizi' in self._kurulu_sekmeler:
+            self.maliyet_tablosunu_guncelle()
+
+        if urunler and self._kurulu_sekmeler & {'Reçete Yönetimi', 'Sipariş İşle'}:
+            secili = None
+            if hasattr(self, 'lst_urunler') and self.lst_urunler.curselection():
+                secili = self.lst_urunler.get(self.lst_urunler.curselection()[0])
+            self.recete_listesini_guncelle()
+            if secili is not None and hasattr(self, 'lst_urunler'):
+                items = self.lst_urunler.get(0, tk.END)
+                if secili in items:
+                    self.lst_urunler.selection_set(items.index(secili))
+                    if secili in urunler:
+                        self.recete_detay_goster()
+
+    def kuyruk_durumu_yenile(self):
+        for i in self.trv_kuyruk.get_children():
+            self.trv_kuyruk.delete(i)
+        satirlar, ozet = [], {}
+        for kuyruk in self.kuyruklar.values():
+            satirlar.extend(kuyruk.db.siparis_kuyrugu_oku())
+            for durum, sayi in kuyruk.db.siparis_kuyrugu_ozet().items():
+                ozet[durum] = ozet.get(durum, 0) + sayi
+        satirlar.sort(key=lambda r: r[1] or "", reverse=True)
+        for no, tarih, urun, adet, oncelik, durum, sonuc in satirlar[:100]:
+            tags = ['hata'] if durum == 'HATA' else ['bekliyor'] if durum == 'BEKLİYOR' else []
+            if oncelik:
+                durum += " (acil)"
+            self.trv_kuyruk.insert('', 'end', values=(no, tarih, urun, adet, durum, (sonuc or "").replace("\n", " ")), tags=tags)
+        self.lbl_kuyruk_ozet.config(text=f"Bekleyen: {ozet.get('BEKLİYOR', 0)}   Tamamlanan: {ozet.get('TAMAMLANDI', 0)}   Hatalı: {ozet.get('HATA', 0)}")
+
+    def maliyet_tablosunu_doldur(self):
+        for i in self.trv_maliyet.get_children():
+            self.trv_maliyet.delete(i)
+        for urun, maliyet in sorted(self.maliyet_motoru.tum_maliyetler().items()):
+            self.trv_maliyet.insert('', 'end', iid=urun, values=(urun, self.maliyet_motoru.bilesen_sayisi(urun), f"{maliyet:.2f}"))
+
+    def maliyet_tablosunu_guncelle(self):
+        """Yalnızca maliyeti geçersizleşen ürünlerin satırlarını yeniler."""
+        for urun, maliyet in self.maliyet_motoru.gecersizleri_al().items():
+            if maliyet is None:
+                if self.trv_maliyet.exists(urun):
+                    self.trv_maliyet.delete(urun)
+                continue
+            degerler = (urun, self.maliyet_motoru.bilesen_sayisi(urun), f"{maliyet:.2f}")
+            if self.trv_maliyet.exists(urun):
+                self.trv_maliyet.item(urun, values=degerler)
+            else:
+                self.trv_maliyet.insert('', 'end', iid=urun, values=degerler)
 
     def gecmis_yenile(self):
         for i in self.trv_gecmis.get_children():
             self.trv_gecmis.delete(i)
-        data = self.db.islem_gecmisi_oku()
+        aranan = self.ent_gecmis_arama.get().strip()
+        if aranan:
+            data = self.db.gecmiste_ara(aranan)
+            self.lbl_gecmis_baslik.config(text=f"Arama Sonuçları ({len(data)})")
+        else:
+            data = self.db.islem_gecmisi_oku()
+            self.lbl_gecmis_baslik.config(text="Son İşlemler")
         for row in data:
-            self.trv_gecmis.insert('', 'end', values=row)
+            self.trv_gecmis.insert('', 'end', iid=str(row[0]), values=row)
+
+    def _gecmis_arama_zamanla(self, event=None):
+        # Her tuşta değil, yazma durduktan kısa süre sonra aranır.
+        if getattr(self, '_gecmis_arama_id', None):
+            self.master.after_cancel(self._gecmis_arama_id)
+        self._gecmis_arama_id = self.master.after(GECMIS_ARAMA_GECIKMESI_MS, self.gecmis_yenile)
 
     def _gecmisi_temizle_islemi(self):
         if messagebox.askyesno("Dikkat", "Tüm işlem geçmişi silinecek."):
@@ -815,17 +2848,70 @@ class MalzemeTakipUygulamasi:
         try:
             with open(path, 'w', newline='', encoding='utf-8-sig') as f:
                 writer = csv.writer(f, delimiter=';') 
-                writer.writerow(['ID', 'Malzeme Adı', 'Miktar', 'Kritik Eşik'])
+                writer.writerow(['ID', 'Malzeme Adı', 'Miktar', 'Kritik Eşik', 'Birim Maliyet'])
                 data = self.db.malzemeleri_oku()
                 writer.writerows(data)
             messagebox.showinfo("Başarılı", "Dosya kaydedildi. Excel ile çift tıklayarak açabilirsiniz.")
         except Exception as e:
             messagebox.showerror("Hata", f"Dosya kaydedilemedi: {e}")
 
+    def yedek_al_islemi(self):
+        self.goster_bildirim("Yedekleme arka planda başlatıldı...", "bilgi")
+        islemler = [(y, y.arka_planda_yedek_al()) for y in self.yedekleyiciler]
+        def kontrol():
+            # Tkinter thread-safe olmadığından sonuç ana thread'den okunur.
+            if any(t.is_alive() for _, t in islemler):
+                self.master.after(200, kontrol)
+                return
+            hatalar = [str(y.son_sonuc) for y, _ in islemler if y.son_sonuc is not True]
+            if hatalar:
+                self.goster_bildirim(" | ".join(hatalar), "hata")
+            elif len(islemler) == 1:
+                self.goster_bildirim(f"Yedek alındı: {os.path.basename(islemler[0][0].son_yedek)}", "bilgi")
+            else:
+                self.goster_bildirim(f"{len(islemler)} atölyenin yedeği alındı.", "bilgi")
+        self.master.after(200, kontrol)
+
+    def yedekten_geri_yukle_islemi(self):
+        ilk_dizin = self.yedekleyiciler[0].yedek_dizini if len(self.yedekleyiciler) == 1 else YEDEK_DIR
+        path = filedialog.askopenfilename(initialdir=ilk_dizin,
+                                          filetypes=[("Veritabanı Yedeği", "*.db.gz *.db")])
+        if not path: return
+        # Yedek, bulunduğu klasörün ait olduğu atölyeye geri yüklenir.
+        klasor = os.path.normcase(os.path.abspath(os.path.dirname(path)))
+        hedefler = [y for y in self.yedekleyiciler if os.path.normcase(os.path.abspath(y.yedek_dizini)) == klasor]
+        if not hedefler and len(self.yedekleyiciler) == 1:
+            hedefler = self.yedekleyiciler
+        if not hedefler:
+            messagebox.showerror("Geri Yükleme", "Yedeğin hangi atölyeye ait olduğu belirlenemedi. Lütfen atölyenin yedek klasöründen seçin.")
+            return
+        if not messagebox.askyesno("Dikkat", "Mevcut veriler seçilen yedekle değiştirilecek. Devam edilsin mi?"):
+            return
+        res = hedefler[0].yedekten_geri_yukle(path)
+        if res is True:
+            self.goster_bildirim("Yedek geri yüklendi.", "bilgi")
+            # Geri yüklenen günlüğün imleci tesadüfen geçerli görünebilir; maliyet önbelleği baştan kurulur.
+            self.maliyet_motoru.sifirla()
+            self.veri_yenile()
+        else:
+            messagebox.showerror("Geri Yükleme Başarısız", str(res))
+
     def veri_yenile(self):
+        # Yalnızca kurulmuş sekmelerin verisi yenilenir; diğerleri ilk açılışta yüklenir.
+        # İmleç yüklemeden önce alınır; arada gelen değişiklikler bir kez daha uygulanır, kaybolmaz.
+        self._degisiklik_imleci = self.db.degisiklik_imleci()
         self.malzeme_tablosunu_doldur()
-        self.gecmis_yenile()
-        self.recete_listesini_guncelle()
+        if 'İşlem Geçmişi' in self._kurulu_sekmeler:
+            self.gecmis_yenile()
+        if self._kurulu_sekmeler & {'Reçete Yönetimi', 'Sipariş İşle'}:
+            self.recete_listesini_guncelle()
+        if 'Sipariş İşle' in self._kurulu_sekmeler:
+            self.kuyruk_durumu_yenile()
+        # Maliyet motoru kendi imleciyle artımlı güncellenir; yalnızca fiyatı değişen ürünler yenilenir.
+        if 'Maliyet Analizi' in self._kurulu_sekmeler:
+            self.maliyet_tablosunu_guncelle()
+        if 'Atölyeler' in self._kurulu_sekmeler:
+            self.atolye_ozetini_doldur()
 
 if __name__ == "__main__":
     root = tk.Tk()